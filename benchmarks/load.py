@@ -0,0 +1,308 @@
+"""
+Drive API routes in-process and report latency percentiles and throughput.
+
+Seeds users owning tasks into a temporary SQLite database, or the one from
+`BENCH_DATABASE_URL`, then sends requests to `create_app()` through ASGI
+transport, so no network or server is involved. Seeded users and their tasks are
+deleted afterwards. Results are stored as JSON to compare them between commits.
+
+Usage: python -m benchmarks.load [--users 10] [--tasks 1000] [--requests 200]
+           [--concurrency 10] [--auth bearer] [--routes tasks_list tasks_get]
+           [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.utils import bench_database, percentile
+from main.app import create_app
+from main.core.config import get_app_settings
+from main.core.security import get_basic_auth_token
+from main.db.seed import SEED_PASSWORD, SeededUser, seeded_users
+
+RESULTS_DIR = Path(__file__).parent / "results"
+BATCH_SIZE = 10
+
+
+class Client(NamedTuple):
+    user: SeededUser
+    headers: Dict[str, str]
+    refresh_token: Optional[str]
+
+
+class Route(NamedTuple):
+    method: str
+    path: str
+    # Build request options for client and request number of this client.
+    build: Callable[[Client, int], Dict[str, Any]] = lambda client, number: {}
+
+
+def task_id(client: Client, number: int) -> Dict[str, Any]:
+    return {"task_id": client.user.task_ids[number % len(client.user.task_ids)]}
+
+
+def batch_ids(client: Client, number: int) -> List[int]:
+    """
+    Return task ids batch taken from the end of seeded tasks.
+    """
+    end = len(client.user.task_ids) - number * BATCH_SIZE
+    return client.user.task_ids[max(end - BATCH_SIZE, 0) : max(end, 0)]
+
+
+# Destructive routes go last, deleting from both ends of seeded tasks.
+ROUTES = {
+    "status": Route("GET", "/api/v1/status"),
+    "status_pool": Route("GET", "/api/v1/status/pool"),
+    "status_cache": Route("GET", "/api/v1/status/cache"),
+    "user_get": Route("GET", "/api/v1/user"),
+    "user_register": Route(
+        "POST",
+        "/api/v1/user",
+        lambda client, number: {
+            "json": {
+                "username": f"{client.user.username}-new-{number}",
+                "email": f"{client.user.username}-new-{number}@example.com",
+                "full_name": "Bench",
+                "password": SEED_PASSWORD,
+            }
+        },
+    ),
+    "user_login": Route(
+        "POST",
+        "/api/v1/user/login",
+        lambda client, number: {
+            "json": {"username": client.user.username, "password": SEED_PASSWORD}
+        },
+    ),
+    "user_login_refresh": Route(
+        "POST",
+        "/api/v1/user/login/refresh",
+        lambda client, number: {"json": {"refresh_token": client.refresh_token}},
+    ),
+    "tasks_list": Route("GET", "/api/v1/tasks"),
+    "tasks_list_filtered": Route(
+        "GET",
+        "/api/v1/tasks",
+        lambda client, number: {
+            "params": {"done": False, "title_contains": "milk", "with_total": True}
+        },
+    ),
+    "tasks_search": Route(
+        "GET", "/api/v1/tasks/search", lambda client, number: {"params": {"q": "milk"}}
+    ),
+    "tasks_stats": Route("GET", "/api/v1/tasks/stats"),
+    "tasks_export": Route("GET", "/api/v1/tasks/export"),
+    "tasks_get": Route("GET", "/api/v1/tasks/{task_id}", task_id),
+    "tasks_create": Route(
+        "POST", "/api/v1/tasks", lambda client, number: {"json": {"title": "bench"}}
+    ),
+    "tasks_update": Route(
+        "PUT",
+        "/api/v1/tasks/{task_id}",
+        lambda client, number: {
+            **task_id(client, number),
+            "json": {"title": f"bench {number}", "done": bool(number % 2)},
+        },
+    ),
+    "tasks_bulk_create": Route(
+        "POST",
+        "/api/v1/tasks/bulk",
+        lambda client, number: {
+            "json": [{"title": f"bench {item}"} for item in range(BATCH_SIZE)]
+        },
+    ),
+    "tasks_bulk_update": Route(
+        "PATCH",
+        "/api/v1/tasks/bulk",
+        lambda client, number: {
+            "json": [
+                {"id": client.user.task_ids[item], "title": "bench", "done": True}
+                for item in range(BATCH_SIZE)
+            ]
+        },
+    ),
+    "tasks_delete": Route("DELETE", "/api/v1/tasks/{task_id}", task_id),
+    "tasks_delete_many": Route(
+        "DELETE",
+        "/api/v1/tasks",
+        lambda client, number: {"json": {"ids": batch_ids(client, number)}},
+    ),
+}
+
+
+def get_commit() -> str:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+    )
+    return result.stdout.strip() or "unknown"
+
+
+async def login(http: httpx.AsyncClient, user: SeededUser, auth: str) -> Client:
+    """
+    Return client authenticated by `auth` scheme, logging in with bearer tokens.
+    """
+    if auth == "basic":
+        token = get_basic_auth_token(username=user.username, password=SEED_PASSWORD)
+        return Client(
+            user=user, headers={"Authorization": f"Basic {token}"}, refresh_token=None
+        )
+    response = await http.post(
+        "/api/v1/user/login",
+        json={
+            "username": user.username,
+            "password": SEED_PASSWORD,
+            "token_type": "bearer",
+        },
+    )
+    response.raise_for_status()
+    token = response.json()["data"]
+    return Client(
+        user=user,
+        headers={"Authorization": f"Bearer {token['token']}"},
+        refresh_token=token["refresh_token"],
+    )
+
+
+async def run_route(
+    http: httpx.AsyncClient,
+    route: Route,
+    clients: List[Client],
+    requests: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    """
+    Send `requests` requests to `route` from `concurrency` workers.
+
+    Requests are spread over clients round-robin.
+    """
+    timings: List[float] = []
+    errors = 0
+    numbers = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for number in numbers:
+            client = clients[number % len(clients)]
+            options = route.build(client, number // len(clients))
+            path = route.path.format(**options)
+            options.pop("task_id", None)
+            started = time.perf_counter()
+            response = await http.request(
+                route.method, path, headers=client.headers, **options
+            )
+            await response.aread()
+            timings.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": requests / elapsed,
+        **{f"p{value}_ms": percentile(timings, value) * 1000 for value in (50, 95, 99)},
+    }
+
+
+async def run(
+    app: FastAPI, users: List[SeededUser], args: argparse.Namespace
+) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    await app.router.startup()
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://bench") as http:
+            clients = [await login(http, user=user, auth=args.auth) for user in users]
+            for name in args.routes:
+                results[name] = await run_route(
+                    http,
+                    route=ROUTES[name],
+                    clients=clients,
+                    requests=args.requests,
+                    concurrency=args.concurrency,
+                )
+                print_result(name, results[name])
+    finally:
+        await app.router.shutdown()
+    return results
+
+
+def print_result(
+    name: str, result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None
+) -> None:
+    line = (
+        f"{name:<20} {result['rps']:9.1f} req/s"
+        f"  p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}"
+        f"  p99 {result['p99_ms']:8.2f} ms  errors {result['errors']}"
+    )
+    if baseline:
+        line += (
+            f"  rps {result['rps'] / baseline['rps'] - 1:+.0%}"
+            f"  p95 {result['p95_ms'] / baseline['p95_ms'] - 1:+.0%}"
+        )
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=1000, help="tasks per user")
+    parser.add_argument("--requests", type=int, default=200, help="per route")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--auth", choices=["basic", "bearer"], default="bearer")
+    parser.add_argument(
+        "--routes", nargs="+", choices=list(ROUTES), default=list(ROUTES)
+    )
+    parser.add_argument("--output", type=Path, help="defaults to results/<commit>.json")
+    parser.add_argument("--compare", type=Path, help="results to compare with")
+    args = parser.parse_args()
+
+    settings = get_app_settings()
+    # Benchmark clients share one address, limits would reject most requests.
+    settings.rate_limits = {}
+    settings.internal_status_enabled = True
+    commit = get_commit()
+    with bench_database() as engine:
+        with seeded_users(users=args.users, tasks=args.tasks) as users:
+            results = asyncio.run(run(create_app(), users=users, args=args))
+
+    output = args.output or RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "commit": commit,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "database": engine.dialect.name,
+                "options": {
+                    key: value
+                    for key, value in vars(args).items()
+                    if key not in ("output", "compare")
+                },
+                "routes": results,
+            },
+            indent=2,
+        )
+    )
+    print(f"results saved to {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        print(f"compared with {baseline['commit']} ({args.compare})")
+        for name, result in results.items():
+            print_result(name, result, baseline=baseline["routes"].get(name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Measure full-text task search latency.
+
+Seeds a dedicated user with random task titles into a temporary SQLite database,
+or the one from `BENCH_DATABASE_URL`, then runs searches through
+`TasksRepository.search_by_owner`. The user and its tasks are deleted afterwards.
+
+Usage: python -m benchmarks.search [--rows 1000000] [--queries 200]
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from sqlalchemy.engine import Engine
+
+from benchmarks.utils import bench_database, percentile
+from main.db.repositories.tasks import TasksRepository
+from main.db.seed import WORDS, SeededUser, seeded_users
+from main.db.session import SessionLocal
+from main.models.task import Task
+from main.schemas.tasks import TaskInDB
+
+
+def run_searches(
+    engine: Engine, owner: SeededUser, queries: int, limit: int
+) -> List[float]:
+    """
+    Return timings of `queries` random searches over tasks of `owner`.
+    """
+    fields = list(TaskInDB.__fields__)
+    timings = []
+    with SessionLocal(bind=engine) as db:
+        tasks_repo = TasksRepository(db=db, model=Task)
+        for _ in range(queries):
+            query = " ".join(random.sample(WORDS, k=random.randint(1, 2)))
+            started = time.perf_counter()
+            tasks_repo.search_by_owner(
+                owner_id=owner.id, fields=fields, text=query, limit=limit
+            )
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    with bench_database() as engine:
+        started = time.perf_counter()
+        with seeded_users(users=1, tasks=args.rows) as (owner,):
+            print(f"seeded {args.rows} tasks in {time.perf_counter() - started:.1f} s")
+            timings = run_searches(
+                engine, owner=owner, queries=args.queries, limit=args.limit
+            )
+    print(
+        f"{engine.dialect.name} search  "
+        + "  ".join(
+            f"p{value} {percentile(timings, value) * 1000:.2f} ms"
+            for value in (50, 95, 99)
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compare task list serialization paths.
+
+Usage: python -m benchmarks.serialization [--number 20]
+"""
+import argparse
+import asyncio
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import root_validator
+
+from main.models.task import Task
+from main.models.user import User  # noqa: F401 configure `Task.owner` relationship
+from main.schemas.response import Response
+from main.schemas.tasks import Task as TaskSchema
+from main.schemas.tasks import TaskInDB
+from main.utils.response import rows_response
+
+SIZES = (100, 10_000)
+
+
+class LegacyTaskInDB(TaskSchema):
+    """
+    Task schema reordering fields with root validator.
+    """
+
+    class Config:
+        orm_mode = True
+        fields_order = ["id", "title", "done"]
+
+    @root_validator
+    def reorder(cls, values: dict) -> dict:
+        return {field: values[field] for field in cls.Config.fields_order}
+
+
+def make_tasks(size: int) -> Tuple[List[Task], List[Tuple[int, str, bool, int]]]:
+    objs, rows = [], []
+    for task_id in range(1, size + 1):
+        task = Task(title=f"Task {task_id}", owner_id=1)
+        task.id = task_id
+        task.done = bool(task_id % 2)
+        task.version = 1
+        objs.append(task)
+        rows.append((task.id, task.title, task.done, task.version))
+    return objs, rows
+
+
+def model_path(schema: Any, objs: List[Task]) -> Callable[[], bytes]:
+    """
+    Build `Response` and let FastAPI validate it against `response_model`.
+    """
+    field = create_response_field(name="Response", type_=Response[List[schema]])
+    loop = asyncio.new_event_loop()
+
+    def run() -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=Response(data=objs))
+        )
+        return JSONResponse(content=content).body
+
+    return run
+
+
+def rows_path(rows: List[Tuple[int, str, bool, int]]) -> Callable[[], bytes]:
+    """
+    Dump column ordered row tuples straight to JSON bytes.
+    """
+    fields = list(TaskInDB.__fields__)
+    return lambda: rows_response(rows, fields=fields).body
+
+
+def measure(func: Callable[[], bytes], number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    for size in SIZES:
+        objs, rows = make_tasks(size)
+        paths: Dict[str, Callable[[], bytes]] = {
+            "legacy": model_path(LegacyTaskInDB, objs),
+            "model": model_path(TaskInDB, objs),
+            "rows": rows_path(rows),
+        }
+        baseline = measure(paths["legacy"], number=args.number)
+        for name, func in paths.items():
+            elapsed = measure(func, number=args.number)
+            print(
+                f"{size:>6} tasks  {name:<7} {elapsed * 1000:9.3f} ms"
+                f"  x{baseline / elapsed:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
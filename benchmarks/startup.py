@@ -0,0 +1,99 @@
+"""
+Measure worker boot time and profile imports of `main.app`.
+
+Time to first request is measured from spawning `uvicorn main.app:app` until
+the status route answers.
+
+Usage: python -m benchmarks.startup [--runs 5] [--top 25]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import List, Tuple
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(timeout: float = 30.0) -> float:
+    """
+    Start uvicorn worker and return seconds until status route answers.
+    """
+    port = get_free_port()
+    url = f"http://127.0.0.1:{port}/api/v1/status"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main.app:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=os.environ.copy(),
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1):  # noqa: S310
+                    return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError(f"Worker did not answer in {timeout} s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def profile_imports(module: str = "main.app") -> List[Tuple[int, int, str]]:
+    """
+    Return self and cumulative import times in microseconds of `module` imports.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:") :].split("|")
+        timings.append((int(self_time), int(cumulative), name.rstrip()))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    timings = profile_imports()
+    print(f"{'self ms':>8} {'total ms':>9}  module")
+    for self_time, cumulative, name in sorted(timings, key=lambda item: -item[1])[
+        : args.top
+    ]:
+        print(f"{self_time / 1000:8.1f} {cumulative / 1000:9.1f} {name}")
+
+    boot_times = [time_to_first_request() for _ in range(args.runs)]
+    print(
+        f"time to first request: median {statistics.median(boot_times) * 1000:.0f} ms"
+        f"  min {min(boot_times) * 1000:.0f} ms  ({args.runs} runs)"
+    )
+
+
+if __name__ == "__main__":
+    main()
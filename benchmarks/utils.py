@@ -0,0 +1,43 @@
+import os
+import statistics
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy.engine import Engine
+
+from main.core.config import get_app_settings
+from main.db.base import Base
+from main.db.session import get_engine
+
+BENCH_DATABASE_URL = "BENCH_DATABASE_URL"
+
+
+@contextmanager
+def bench_database() -> Iterator[Engine]:
+    """
+    Point settings to `BENCH_DATABASE_URL` or to a temporary SQLite database.
+
+    Missing tables are created, temporary database is removed on exit. Must be
+    entered before engines are created.
+    """
+    settings = get_app_settings()
+    with tempfile.TemporaryDirectory() as directory:
+        settings.database_url = os.environ.get(
+            BENCH_DATABASE_URL, f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        )
+        engine = get_engine()
+        Base.metadata.create_all(bind=engine)
+        try:
+            yield engine
+        finally:
+            engine.dispose()
+
+
+def percentile(timings: List[float], value: int) -> float:
+    """
+    Return `value` percentile of timings, exact for small samples.
+    """
+    if len(timings) < 2:
+        return timings[0] if timings else 0.0
+    return statistics.quantiles(timings, n=100, method="inclusive")[value - 1]
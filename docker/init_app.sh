@@ -9,6 +9,6 @@ done
 echo "PostgreSQL started"
 
 make migrate
-make runserver_docker
+make runserver_prod
 
 exec "$@"
@@ -0,0 +1,34 @@
+"""
+Gunicorn configuration of production server, see `make runserver_prod`.
+
+Options are taken from application settings.
+"""
+from main.core.config import get_app_settings
+from main.core.logging import restart_logging_after_fork
+from main.core.security import reset_hashing_executor_after_fork
+from main.db.session import reset_engines_after_fork
+
+settings = get_app_settings()
+
+bind = f"{settings.server_host}:{settings.server_port}"
+workers = settings.server_workers_count
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = settings.server_keepalive
+backlog = settings.server_backlog
+timeout = settings.server_timeout
+graceful_timeout = settings.server_graceful_timeout
+# Application is imported once in master process and shared by forked workers.
+preload_app = settings.server_preload
+# Uvicorn workers take client address from `X-Forwarded-For` of these proxies.
+forwarded_allow_ips = settings.server_forwarded_allow_ips
+
+
+def post_fork(server, worker):  # type: ignore
+    """
+    Drop state of preloaded application that must not be shared between workers.
+
+    Database engines and pools are disposed by application shutdown handlers.
+    """
+    reset_engines_after_fork()
+    reset_hashing_executor_after_fork()
+    restart_logging_after_fork()
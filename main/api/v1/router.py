@@ -1,9 +1,40 @@
-from fastapi import APIRouter
+from fastapi import Depends, FastAPI
 
 from main.api.v1.routes import status, tasks, user
+from main.core.concurrency import limit_concurrency
+from main.core.config import get_app_settings
 
-router = APIRouter()
+# Every `include_router` rebuilds included routes along with their response
+# models, so routers are included straight into application.
+routers = [
+    (status.router, "status", ["Status"]),
+    (user.router, "user", ["User"]),
+    (tasks.router, "tasks", ["Tasks"]),
+]
 
-router.include_router(router=status.router, tags=["Status"], prefix="/status")
-router.include_router(router=user.router, tags=["User"], prefix="/user")
-router.include_router(router=tasks.router, tags=["Tasks"], prefix="/tasks")
+
+def include_routers(app: FastAPI, prefix: str) -> None:
+    """
+    Include API routers into application under `prefix`.
+
+    Routers with concurrency limit in settings get a limiting dependency,
+    internal status routes are included only if enabled in settings.
+    """
+    settings = get_app_settings()
+    limits = settings.router_concurrency_limits
+    for router, name, tags in routers:
+        dependencies = []
+        if limits.get(name):
+            dependencies.append(
+                Depends(limit_concurrency(name, total_tokens=limits[name]))
+            )
+        app.include_router(
+            router=router,
+            tags=tags,
+            prefix=f"{prefix}/{name}",
+            dependencies=dependencies,
+        )
+    if settings.internal_status_enabled:
+        app.include_router(
+            router=status.internal_router, tags=["Status"], prefix=f"{prefix}/status"
+        )
@@ -1,14 +1,47 @@
+from typing import Dict
+
 from fastapi import APIRouter
 
-from main.schemas.status import Status
+from main.core.cache import get_cache_backend
+from main.core.security import get_credentials_cache
+from main.db.pool import get_pool_status
+from main.db.session import get_created_engines
+from main.schemas.status import CacheStatus, PoolStatus, Status
 from version import response
 
 router = APIRouter()
+# Included only with `internal_status_enabled` setting, as routes are public.
+internal_router = APIRouter()
 
 
 @router.get("", response_model=Status)
-def status() -> Status:
+async def status() -> Status:
     """
     Health check for API.
     """
     return Status(**response)
+
+
+@internal_router.get(
+    "/pool", response_model=Dict[str, PoolStatus], include_in_schema=False
+)
+async def pool_status() -> Dict[str, PoolStatus]:
+    """
+    Connection pool usage of database engines used by the worker.
+    """
+    return {
+        name: PoolStatus(**get_pool_status(engine=engine))
+        for name, engine in get_created_engines().items()
+    }
+
+
+@internal_router.get("/cache", response_model=CacheStatus, include_in_schema=False)
+async def cache_status() -> CacheStatus:
+    """
+    Cache sizes and hit ratios.
+    """
+    cache = get_cache_backend()
+    return CacheStatus(
+        tasks=cache.stats() if cache is not None else None,
+        credentials=get_credentials_cache().stats(),
+    )
@@ -1,96 +1,362 @@
-from typing import List
+from collections.abc import AsyncIterable
+from typing import AsyncIterator, Iterator, List, Optional, Union
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Request
 from fastapi.params import Depends
-from starlette.status import HTTP_201_CREATED
+from fastapi.responses import ORJSONResponse
+from starlette.responses import Response as HTTPResponse
+from starlette.responses import StreamingResponse
+from starlette.status import (
+    HTTP_201_CREATED,
+    HTTP_404_NOT_FOUND,
+    HTTP_412_PRECONDITION_FAILED,
+)
 
+from main.core.config import get_app_settings
 from main.core.dependencies import (
-    basic_security,
-    get_current_active_user,
+    check_batch_size,
+    get_current_active_identity,
+    get_current_identity,
     get_current_task,
-    get_current_user,
+    tasks_repository,
 )
-from main.db.repositories.tasks import TasksRepository, get_tasks_repository
+from main.core.exceptions import TaskNotFoundException, TaskVersionConflictException
+from main.core.security import Identity
+from main.db.repositories.base import call_repo
+from main.db.repositories.tasks import TasksRepositoryType
 from main.models.task import Task
-from main.models.user import User
 from main.schemas.response import Response
-from main.schemas.tasks import TaskInCreate, TaskInDB, TaskInUpdate, TasksInDelete
+from main.schemas.tasks import (
+    TaskInBulkResult,
+    TaskInBulkUpdate,
+    TaskInCreate,
+    TaskInDB,
+    TaskInUpdate,
+    TasksFilter,
+    TasksInDelete,
+    TasksStats,
+)
+from main.utils.etag import (
+    get_if_match_tags,
+    is_not_modified,
+    make_etag,
+    make_version_etag,
+    not_modified_response,
+)
+from main.utils.export import ExportFormat, aiter_export, iter_export
+from main.utils.pagination import decode_cursor, encode_cursor
+from main.utils.response import rows_response
 
-router = APIRouter(dependencies=[Depends(basic_security)])
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 @router.get("", response_model=Response[List[TaskInDB]])
-def get_all_task(
+async def get_all_task(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    tasks_repo: TasksRepository = Depends(get_tasks_repository),
-    current_user: User = Depends(get_current_user),
-) -> Response:
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+    filters: TasksFilter = Depends(),
+    tasks_repo: TasksRepositoryType = Depends(tasks_repository),
+    current_user: Identity = Depends(get_current_identity),
+) -> HTTPResponse:
     """
     Retrieve all tasks.
+
+    Pass `next_cursor` from the previous page as `cursor` to get the next page,
+    `skip` is ignored in this case. Send `ETag` of the previous response as
+    `If-None-Match` to get `304 Not Modified` while tasks are unchanged.
+
+    Pass `with_total` to count filtered tasks, counts over the configured limit
+    are cut to the limit with `total_exact` set to `false`.
+    """
+    etag = make_etag(
+        "tasks",
+        current_user.id,
+        await call_repo(tasks_repo.get_version, owner_id=current_user.id),
+        request.url.query,
+    )
+    if is_not_modified(request=request, etag=etag):
+        return not_modified_response(etag=etag)
+    after_id = decode_cursor(cursor, fields={"id": int})["id"] if cursor else None
+    fields = list(TaskInDB.__fields__)
+    tasks = await call_repo(
+        tasks_repo.get_rows_by_owner,
+        owner_id=current_user.id,
+        fields=fields,
+        skip=skip,
+        limit=limit,
+        after_id=after_id,
+        filters=filters,
+    )
+    next_cursor = None
+    if tasks and len(tasks) == limit:
+        next_cursor = encode_cursor({"id": tasks[-1].id})
+    total, total_exact = None, None
+    if with_total:
+        total, total_exact = await call_repo(
+            tasks_repo.count_by_owner,
+            owner_id=current_user.id,
+            limit=get_app_settings().tasks_count_limit,
+            filters=filters,
+        )
+    response = rows_response(
+        tasks,
+        fields=fields,
+        next_cursor=next_cursor,
+        total=total,
+        total_exact=total_exact,
+    )
+    response.headers["ETag"] = etag
+    return response
+
+
+@router.get("/search", response_model=Response[List[TaskInDB]])
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    tasks_repo: TasksRepositoryType = Depends(tasks_repository),
+    current_user: Identity = Depends(get_current_identity),
+) -> HTTPResponse:
+    """
+    Search tasks by title, most relevant first.
+
+    Pass `next_cursor` from the previous page as `cursor` to get the next page.
+    """
+    after = None
+    if cursor:
+        values = decode_cursor(cursor, fields={"score": (int, float), "id": int})
+        after = (values["score"], values["id"])
+    fields = list(TaskInDB.__fields__)
+    rows = await call_repo(
+        tasks_repo.search_by_owner,
+        owner_id=current_user.id,
+        fields=fields,
+        text=q,
+        limit=limit,
+        after=after,
+    )
+    next_cursor = None
+    if rows and len(rows) == limit:
+        next_cursor = encode_cursor({"score": rows[-1].score, "id": rows[-1].id})
+    return rows_response(rows, fields=fields, next_cursor=next_cursor)
+
+
+@router.get("/stats", response_model=Response[TasksStats])
+async def get_tasks_stats(
+    request: Request,
+    response: HTTPResponse,
+    tasks_repo: TasksRepositoryType = Depends(tasks_repository),
+    current_user: Identity = Depends(get_current_identity),
+) -> Union[Response, HTTPResponse]:
+    """
+    Retrieve counts of done and undone tasks.
+    """
+    version = await call_repo(tasks_repo.get_version, owner_id=current_user.id)
+    etag = make_etag("tasks-stats", current_user.id, version)
+    if is_not_modified(request=request, etag=etag):
+        return not_modified_response(etag=etag)
+    response.headers["ETag"] = etag
+    stats = await call_repo(tasks_repo.get_stats_by_owner, owner_id=current_user.id)
+    return Response(data=TasksStats(**stats))
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_tasks(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    tasks_repo: TasksRepositoryType = Depends(tasks_repository),
+    current_user: Identity = Depends(get_current_identity),
+) -> StreamingResponse:
+    """
+    Export all tasks as NDJSON or CSV stream.
+    """
+    chunk_size = get_app_settings().export_chunk_size
+    fields = list(TaskInDB.__fields__)
+    rows = await call_repo(
+        tasks_repo.stream_by_owner,
+        owner_id=current_user.id,
+        fields=fields,
+        chunk_size=chunk_size,
+    )
+    content: Union[Iterator[str], AsyncIterator[str]]
+    if isinstance(rows, AsyncIterable):
+        content = aiter_export(
+            rows, fields=fields, export_format=export_format, chunk_size=chunk_size
+        )
+    else:
+        content = iter_export(
+            rows, fields=fields, export_format=export_format, chunk_size=chunk_size
+        )
+    return StreamingResponse(
+        content,
+        media_type=export_format.media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename=tasks.{export_format.value}"
+        },
+    )
+
+
+@router.post(
+    "/bulk",
+    response_model=Response[List[TaskInBulkResult]],
+    status_code=HTTP_201_CREATED,
+    dependencies=[Depends(check_batch_size)],
+)
+async def create_tasks(
+    tasks: List[TaskInCreate],
+    tasks_repo: TasksRepositoryType = Depends(tasks_repository),
+    current_user: Identity = Depends(get_current_active_identity),
+) -> Response:
+    """
+    Bulk create tasks in a single transaction.
+    """
+    created_tasks = await call_repo(
+        tasks_repo.create_many_with_owner, objs_create=tasks, owner_id=current_user.id
+    )
+    results = [TaskInBulkResult(id=task.id, data=task) for task in created_tasks]
+    return Response(data=results, message="The tasks was created successfully")
+
+
+@router.patch(
+    "/bulk",
+    response_model=Response[List[TaskInBulkResult]],
+    dependencies=[Depends(check_batch_size)],
+)
+async def update_tasks(
+    tasks: List[TaskInBulkUpdate],
+    tasks_repo: TasksRepositoryType = Depends(tasks_repository),
+    current_user: Identity = Depends(get_current_active_identity),
+) -> Response:
     """
-    tasks = tasks_repo.get_all_by_owner(
-        owner_id=current_user.id, skip=skip, limit=limit
+    Bulk update tasks in a single transaction.
+
+    Tasks not found for the current user are reported as failed items.
+    """
+    updated_tasks = await call_repo(
+        tasks_repo.update_many_by_owner, objs_update=tasks, owner_id=current_user.id
     )
-    return Response(data=tasks)
+    results = []
+    for task in tasks:
+        if task.id in updated_tasks:
+            results.append(TaskInBulkResult(id=task.id, data=updated_tasks[task.id]))
+        else:
+            results.append(
+                TaskInBulkResult(
+                    id=task.id,
+                    success=False,
+                    message=f"Task with id `{task.id}` not found",
+                )
+            )
+    return Response(data=results, message="The tasks was updated successfully")
 
 
 @router.get("/{task_id}", response_model=Response[TaskInDB])
-def get_task(task: Task = Depends(get_current_task)) -> Response:
+async def get_task(
+    request: Request, response: HTTPResponse, task: Task = Depends(get_current_task)
+) -> Union[Response, HTTPResponse]:
     """,
     Retrieve a task by `task_id`.
     """
+    etag = make_version_etag(task.version, task.id, task.title, task.done)
+    if is_not_modified(request=request, etag=etag):
+        return not_modified_response(etag=etag)
+    response.headers["ETag"] = etag
     return Response(data=task)
 
 
 @router.post("", response_model=Response[TaskInDB], status_code=HTTP_201_CREATED)
-def create_task(
+async def create_task(
     task: TaskInCreate,
-    tasks_repo: TasksRepository = Depends(get_tasks_repository),
-    current_user: User = Depends(get_current_active_user),
+    tasks_repo: TasksRepositoryType = Depends(tasks_repository),
+    current_user: Identity = Depends(get_current_active_identity),
 ) -> Response:
     """
     Create new task.
     """
-    task = tasks_repo.create_with_owner(obj_create=task, owner_id=current_user.id)
+    task = await call_repo(
+        tasks_repo.create_with_owner, obj_create=task, owner_id=current_user.id
+    )
     return Response(data=task, message="The task was created successfully")
 
 
 @router.put("/{task_id}", response_model=Response[TaskInDB])
-def update_task(
+async def update_task(
+    request: Request,
+    response: HTTPResponse,
     task_in_update: TaskInUpdate,
     task: Task = Depends(get_current_task),
-    tasks_repo: TasksRepository = Depends(get_tasks_repository),
+    tasks_repo: TasksRepositoryType = Depends(tasks_repository),
 ) -> Response:
     """
     Update task by `task_id`.
+
+    Send `ETag` of the task as `If-Match` to update it only if the task was not
+    changed since, `412 Precondition Failed` is returned otherwise.
     """
-    task = tasks_repo.update(obj=task, obj_update=task_in_update)
+    task_id = task.id
+    if_match = get_if_match_tags(request=request)
+    if if_match is None:
+        updated_task = await call_repo(
+            tasks_repo.update, obj=task, obj_update=task_in_update
+        )
+        if updated_task is None:
+            raise TaskNotFoundException(
+                message=f"Task with id `{task_id}` not found",
+                status_code=HTTP_404_NOT_FOUND,
+            )
+    else:
+        updated_task = None
+        if make_version_etag(task.version, task.id, task.title, task.done) in if_match:
+            # Task may change after it was read, so the version is checked again.
+            updated_task = await call_repo(
+                tasks_repo.update_if_version,
+                obj=task,
+                obj_update=task_in_update,
+                version=task.version,
+            )
+        if updated_task is None:
+            raise TaskVersionConflictException(
+                message=f"Task with id `{task_id}` was changed by another request",
+                status_code=HTTP_412_PRECONDITION_FAILED,
+            )
+    task = updated_task
+    response.headers["ETag"] = make_version_etag(
+        task.version, task.id, task.title, task.done
+    )
     return Response(data=task, message="The task was updated successfully")
 
 
 @router.delete("/{task_id}", response_model=Response[TaskInDB])
-def delete_task(
+async def delete_task(
     task: Task = Depends(get_current_task),
-    tasks_repo: TasksRepository = Depends(get_tasks_repository),
+    tasks_repo: TasksRepositoryType = Depends(tasks_repository),
 ) -> Response:
     """
     Delete task by `task_id`.
     """
-    task = tasks_repo.delete(obj_id=task.id)
-    return Response(data=task, message="The task was deleted successfully")
+    deleted_task = await call_repo(tasks_repo.delete, obj_id=task.id)
+    if deleted_task is None:
+        raise TaskNotFoundException(
+            message=f"Task with id `{task.id}` not found",
+            status_code=HTTP_404_NOT_FOUND,
+        )
+    return Response(data=deleted_task, message="The task was deleted successfully")
 
 
 @router.delete("", response_model=Response[TasksInDelete])
-def delete_tasks(
+async def delete_tasks(
     tasks: TasksInDelete,
-    tasks_repo: TasksRepository = Depends(get_tasks_repository),
-    current_user: User = Depends(get_current_active_user),
+    tasks_repo: TasksRepositoryType = Depends(tasks_repository),
+    current_user: Identity = Depends(get_current_active_identity),
 ) -> Response:
     """
     Bulk delete tasks.
     """
-    tasks = tasks_repo.delete_many_by_owner(obj_ids=tasks.ids, owner_id=current_user.id)
+    tasks = await call_repo(
+        tasks_repo.delete_many_by_owner, obj_ids=tasks.ids, owner_id=current_user.id
+    )
     return Response(
         data=TasksInDelete(ids=tasks), message="The tasks was deleted successfully"
     )
@@ -1,10 +1,24 @@
+from typing import Union
+
 from fastapi import APIRouter, Depends
 
-from main.core.dependencies import get_current_user
+from main.core.config import get_app_settings
+from main.core.dependencies import get_current_user, rate_limit
 from main.models.user import User
 from main.schemas.response import Response
-from main.schemas.user import UserInCreate, UserInDB, UserLogin, UserToken
-from main.services.user import UserService
+from main.schemas.user import (
+    UserInCreate,
+    UserInDB,
+    UserLogin,
+    UserToken,
+    UserTokenRefresh,
+)
+from main.services.user import AsyncUserService, UserService
+
+settings = get_app_settings()
+
+UserServiceType = Union[UserService, AsyncUserService]
+user_service_class = AsyncUserService if settings.async_database else UserService
 
 router = APIRouter()
 
@@ -17,21 +31,54 @@ def get_user(user: User = Depends(get_current_user)) -> Response:
     return Response(data=user)
 
 
-@router.post("", response_model=Response[UserInDB])
-def register_user(
-    user: UserInCreate, user_service: UserService = Depends()
+@router.delete("", response_model=Response[UserInDB])
+async def disable_user(
+    user: User = Depends(get_current_user),
+    user_service: UserServiceType = Depends(user_service_class),
+) -> Response:
+    """
+    Disable current user, revoking all issued tokens.
+    """
+    user = await user_service.disable_user(user_id=user.id)
+    return Response(data=user, message="The user was disabled successfully")
+
+
+@router.post(
+    "",
+    response_model=Response[UserInDB],
+    dependencies=[Depends(rate_limit("register", keys=("ip",)))],
+)
+async def register_user(
+    user: UserInCreate, user_service: UserServiceType = Depends(user_service_class)
 ) -> Response:
     """
     Process user registration.
     """
-    user = user_service.register_user(user_create=user)
+    user = await user_service.register_user(user_create=user)
     return Response(data=user, message="The user was register successfully")
 
 
-@router.post("/login", response_model=Response[UserToken])
-def login_user(user: UserLogin, user_service: UserService = Depends()) -> Response:
+@router.post(
+    "/login",
+    response_model=Response[UserToken],
+    dependencies=[Depends(rate_limit("login", keys=("ip", "username")))],
+)
+async def login_user(
+    user: UserLogin, user_service: UserServiceType = Depends(user_service_class)
+) -> Response:
     """
     Process user login.
     """
-    token = user_service.login_user(user=user)
+    token = await user_service.login_user(user=user)
     return Response(data=token, message="The user authenticated successfully")
+
+
+@router.post("/login/refresh", response_model=Response[UserToken])
+async def refresh_token(
+    token: UserTokenRefresh, user_service: UserServiceType = Depends(user_service_class)
+) -> Response:
+    """
+    Issue new signed tokens by refresh token.
+    """
+    token = await user_service.refresh_tokens(refresh_token=token.refresh_token)
+    return Response(data=token, message="The token was refreshed successfully")
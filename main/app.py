@@ -1,9 +1,21 @@
 from fastapi import FastAPI
+from sqlalchemy.engine import Engine
 from starlette.middleware.cors import CORSMiddleware
 
-from main.api.v1.router import router as api_router
+from main.api.v1.router import include_routers
+from main.core.admission import AdmissionController, AdmissionMiddleware
+from main.core.concurrency import setup_threadpool
 from main.core.config import get_app_settings
 from main.core.exceptions import add_exceptions_handlers
+from main.core.logging import RequestIdMiddleware, setup_logging, stop_logging
+from main.core.metrics import (
+    MetricsMiddleware,
+    get_metrics_registry,
+    instrument_engine,
+    metrics_endpoint,
+)
+from main.core.security import shutdown_hashing_executor
+from main.db.session import dispose_engines
 
 
 def create_app() -> FastAPI:
@@ -12,8 +24,29 @@ def create_app() -> FastAPI:
     """
     settings = get_app_settings()
 
+    setup_logging(
+        level=settings.logging_level,
+        log_format=settings.logging_format,
+        use_queue=settings.logging_queue,
+        sampling=settings.logging_sampling,
+        debug_sql=settings.debug,
+    )
+
     application = FastAPI(**settings.fastapi_kwargs)
 
+    if settings.admission_max_in_flight:
+        application.add_middleware(
+            AdmissionMiddleware,
+            controller=AdmissionController(
+                max_in_flight=settings.admission_max_in_flight,
+                max_queue=settings.admission_max_queue,
+                queue_timeout=settings.admission_queue_timeout,
+                shares=settings.admission_priority_shares,
+            ),
+            retry_after=settings.admission_retry_after,
+            registry=get_metrics_registry() if settings.metrics_enabled else None,
+        )
+
     application.add_middleware(
         CORSMiddleware,
         allow_origins=settings.allowed_hosts,
@@ -22,10 +55,21 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    application.include_router(api_router, prefix="/api/v1")
+    if settings.metrics_enabled:
+        instrument_engine(Engine)
+        application.add_middleware(MetricsMiddleware, registry=get_metrics_registry())
+        application.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+    application.add_middleware(RequestIdMiddleware)
+
+    include_routers(app=application, prefix="/api/v1")
 
     add_exceptions_handlers(app=application)
 
+    application.add_event_handler("startup", setup_threadpool)
+    application.add_event_handler("shutdown", shutdown_hashing_executor)
+    application.add_event_handler("shutdown", dispose_engines)
+    application.add_event_handler("shutdown", stop_logging)
+
     return application
 
 
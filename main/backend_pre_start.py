@@ -3,7 +3,7 @@ import logging
 from tenacity import after_log, before_log, retry, stop_after_attempt, wait_fixed
 
 from main.core.logging import logger
-from main.db.session import SessionLocal
+from main.db.session import SessionLocal, get_engine
 
 max_tries = 60 * 2  # 2 minutes
 wait_seconds = 5
@@ -16,7 +16,7 @@ wait_seconds = 5
     after=after_log(logger, logging.WARN),
 )
 def init() -> None:
-    db = SessionLocal()
+    db = SessionLocal(bind=get_engine())
     try:
         # Try to create session to check if DB is awake
         db.execute("SELECT 1")
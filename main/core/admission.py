@@ -0,0 +1,201 @@
+"""
+Module with admission control, shedding requests the server can not keep up with.
+
+Requests over the in-flight limit wait in a bounded queue, served by priority,
+and are rejected with `503` and `Retry-After` when the queue is full or the
+wait is too long. Lower priorities get a smaller share of the limit, so they
+are shed first.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from starlette.responses import JSONResponse
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from main.core.metrics import MetricsRegistry
+
+CRITICAL = "critical"
+HIGH = "high"
+NORMAL = "normal"
+LOW = "low"
+# Queued priorities, from first to last served.
+QUEUED_PRIORITIES = (HIGH, NORMAL, LOW)
+
+CRITICAL_PATHS = ("/api/v1/status", "/metrics")
+REGISTRATION_PATH = "/api/v1/user"
+READ_METHODS = ("GET", "HEAD")
+
+
+def get_priority(scope: Scope) -> str:
+    """
+    Return priority class of request.
+
+    Health checks are never shed, authenticated reads go first, registration
+    and bulk operations go last.
+    """
+    path, method = scope["path"], scope["method"]
+    if path.startswith(CRITICAL_PATHS):
+        return CRITICAL
+    if (method == "POST" and path.rstrip("/") == REGISTRATION_PATH) or (
+        path.endswith("/bulk")
+    ):
+        return LOW
+    if method in READ_METHODS and any(
+        name == b"authorization" for name, _ in scope["headers"]
+    ):
+        return HIGH
+    return NORMAL
+
+
+class AdmissionController:
+    """
+    Limit in-flight requests, queueing the excess by priority.
+
+    `shares` maps priority to share of `max_in_flight` it may fill.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        shares: Dict[str, float],
+    ) -> None:
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.limits = {
+            priority: max(math.ceil(max_in_flight * shares.get(priority, 1.0)), 1)
+            for priority in QUEUED_PRIORITIES
+        }
+        self.in_flight = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {
+            priority: deque() for priority in QUEUED_PRIORITIES
+        }
+
+    def _can_admit(self, priority: str) -> bool:
+        return self.in_flight < self.limits[priority]
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def _evict_lower(self, priority: str) -> bool:
+        """
+        Reject the latest queued request of lower priority, to queue instead of it.
+        """
+        for waiting_priority in reversed(QUEUED_PRIORITIES):
+            if waiting_priority == priority:
+                return False
+            waiters = self._waiters[waiting_priority]
+            if waiters:
+                waiters.pop().set_result(False)
+                return True
+        return False
+
+    def _has_waiters(self, priority: str) -> bool:
+        for waiting_priority in QUEUED_PRIORITIES:
+            if self._waiters[waiting_priority]:
+                return True
+            if waiting_priority == priority:
+                return False
+        return False
+
+    async def acquire(self, priority: str) -> bool:
+        """
+        Wait for a slot, return whether request was admitted.
+        """
+        if priority == CRITICAL or (
+            self._can_admit(priority) and not self._has_waiters(priority)
+        ):
+            self.in_flight += 1
+            return True
+        if self.queue_timeout <= 0 or (
+            self.queued >= self.max_queue and not self._evict_lower(priority)
+        ):
+            return False
+
+        # Admitted waiter gets `True`, with slot taken on its behalf by `release`.
+        waiter: asyncio.Future = asyncio.get_running_loop().create_future()
+        waiters = self._waiters[priority]
+        waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                self.release()
+            raise
+        finally:
+            if waiter in waiters:
+                waiters.remove(waiter)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        for priority in QUEUED_PRIORITIES:
+            waiters = self._waiters[priority]
+            while waiters and self._can_admit(priority):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self.in_flight += 1
+                    waiter.set_result(True)
+            if waiters:
+                break
+
+
+class AdmissionMiddleware:
+    """
+    Admit HTTP requests through `AdmissionController`, shedding the excess.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        retry_after: int,
+        registry: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.app = app
+        self.controller = controller
+        self.retry_after = retry_after
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority = get_priority(scope)
+        started_at = time.perf_counter()
+        admitted = await self.controller.acquire(priority)
+        if self.registry is not None:
+            self.registry.observe_admission(
+                priority=priority,
+                wait=time.perf_counter() - started_at,
+                admitted=admitted,
+                in_flight=self.controller.in_flight,
+            )
+        if not admitted:
+            response = JSONResponse(
+                status_code=HTTP_503_SERVICE_UNAVAILABLE,
+                content={
+                    "success": False,
+                    "status": HTTP_503_SERVICE_UNAVAILABLE,
+                    "type": "ServiceOverloaded",
+                    "message": "Server is overloaded, retry later",
+                },
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+            if self.registry is not None:
+                self.registry.admission_in_flight.set(self.controller.in_flight)
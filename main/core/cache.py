@@ -0,0 +1,205 @@
+"""
+Module with in-process cache primitives.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Generic, Hashable, Iterable, Optional, Tuple, TypeVar
+
+from main.core.config import get_app_settings
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+GENERATION_SLOTS = 4096
+
+
+class TTLCache(Generic[KeyType, ValueType]):
+    """
+    Thread-safe LRU cache with bounded size and per-entry time to live.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """
+        :param maxsize: Maximum number of stored entries, `0` disables caching.
+        :param ttl: Entry time to live in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[KeyType, Tuple[float, ValueType]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: KeyType) -> Optional[ValueType]:
+        """
+        Return cached value or `None` if key is missing or expired.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: KeyType, value: ValueType) -> None:
+        """
+        Store value and evict the least recently used entries over `maxsize`.
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: KeyType) -> None:
+        """
+        Drop value from cache if present.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drop all values from cache.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return cache size and hit/miss counters.
+        """
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+        }
+
+
+class CacheBackend(ABC):
+    """
+    Interface of key-value cache storing JSON serializable values.
+
+    Implement it to plug in an external cache shared by all workers.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return cached value or `None` on miss.
+        """
+
+    @abstractmethod
+    def set(
+        self, key: str, value: Dict[str, Any], generation: Optional[int] = None
+    ) -> None:
+        """
+        Store value, skipped if `key` was invalidated since `generation` was read.
+        """
+
+    @abstractmethod
+    def get_generation(self, key: str) -> int:
+        """
+        Return invalidation generation of `key`, changed by `delete_many`.
+
+        Readers take it before loading the value, so a value loaded before a
+        concurrent write is not stored after the write invalidated `key`.
+        """
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[str]) -> None:
+        """
+        Drop values by keys, changing their generations.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Drop all values.
+        """
+
+    @abstractmethod
+    def stats(self) -> Dict[str, float]:
+        """
+        Return cache size and hit/miss counters.
+        """
+
+    def delete(self, key: str) -> None:
+        """
+        Drop value by key.
+        """
+        self.delete_many([key])
+
+
+class LRUCacheBackend(CacheBackend):
+    """
+    In-process LRU cache backend with per-entry time to live.
+
+    Invalidation is only seen by the current process, so `ttl` bounds
+    staleness of entries changed by other workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._cache: TTLCache[str, Dict[str, Any]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Keys share generations by hash, collisions only skip some stores.
+        self._generations = [0] * GENERATION_SLOTS
+        self._lock = threading.Lock()
+
+    def _slot(self, key: str) -> int:
+        return hash(key) % GENERATION_SLOTS
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(key)
+
+    def set(
+        self, key: str, value: Dict[str, Any], generation: Optional[int] = None
+    ) -> None:
+        with self._lock:
+            if generation is None or self._generations[self._slot(key)] == generation:
+                self._cache.set(key, value)
+
+    def get_generation(self, key: str) -> int:
+        return self._generations[self._slot(key)]
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._generations[self._slot(key)] += 1
+                self._cache.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generations = [generation + 1 for generation in self._generations]
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, float]:
+        return self._cache.stats()
+
+
+@lru_cache
+def get_cache_backend() -> Optional[CacheBackend]:
+    """
+    Return cache backend for repository reads, `None` if caching is disabled.
+    """
+    settings = get_app_settings()
+    if settings.cache_size <= 0:
+        return None
+    return LRUCacheBackend(maxsize=settings.cache_size, ttl=settings.cache_ttl)
@@ -0,0 +1,44 @@
+"""
+Module with threadpool configuration for sync routes and dependencies.
+"""
+from typing import AsyncIterator, Callable, Dict
+
+from anyio import CapacityLimiter
+from anyio.to_thread import current_default_thread_limiter
+
+from main.core.config import get_app_settings
+
+_limiters: Dict[str, CapacityLimiter] = {}
+
+
+def setup_threadpool() -> None:
+    """
+    Set size of default threadpool running sync routes and dependencies.
+
+    Must run in event loop, as the limiter is bound to it.
+    """
+    current_default_thread_limiter().total_tokens = get_app_settings().threadpool_size
+
+
+def get_limiter(name: str, total_tokens: int) -> CapacityLimiter:
+    """
+    Return limiter shared by requests of router `name`, created in event loop.
+    """
+    if name not in _limiters:
+        _limiters[name] = CapacityLimiter(total_tokens)
+    return _limiters[name]
+
+
+def limit_concurrency(name: str, total_tokens: int) -> Callable[[], AsyncIterator]:
+    """
+    Return dependency admitting at most `total_tokens` requests of a router.
+
+    Waiting requests hold no threads, so one router can not take the whole
+    threadpool from the others.
+    """
+
+    async def dependency() -> AsyncIterator[None]:
+        async with get_limiter(name, total_tokens=total_tokens):
+            yield
+
+    return dependency
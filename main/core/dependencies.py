@@ -1,46 +1,130 @@
-from fastapi import Depends
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import (
+    HTTPAuthorizationCredentials,
+    HTTPBasic,
+    HTTPBasicCredentials,
+    HTTPBearer,
+)
 from starlette.status import (
     HTTP_400_BAD_REQUEST,
+    HTTP_401_UNAUTHORIZED,
     HTTP_403_FORBIDDEN,
     HTTP_404_NOT_FOUND,
+    HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    HTTP_429_TOO_MANY_REQUESTS,
 )
 
+from main.core.config import get_app_settings
 from main.core.exceptions import (
+    BatchSizeLimitException,
     InactiveUserAccountException,
+    RateLimitExceededException,
     TaskNotFoundException,
+    UserNotFoundException,
     UserPermissionException,
 )
-from main.db.repositories.tasks import TasksRepository, get_tasks_repository
+from main.core.ratelimit import RateLimit, get_rate_limit_backend, get_retry_after
+from main.core.security import Identity
+from main.db.repositories.base import call_repo
+from main.db.repositories.tasks import (
+    TasksRepositoryType,
+    get_async_tasks_repository,
+    get_tasks_repository,
+)
 from main.models.task import Task
 from main.models.user import User
 from main.services.user import UserService
 
-basic_security = HTTPBasic()
+basic_security = HTTPBasic(auto_error=False)
+bearer_security = HTTPBearer(auto_error=False)
+tasks_repository = (
+    get_async_tasks_repository
+    if get_app_settings().async_database
+    else get_tasks_repository
+)
+
+
+def get_current_identity(
+    request: Request,
+    user_service: UserService = Depends(),
+    basic_credentials: Optional[HTTPBasicCredentials] = Depends(basic_security),
+    bearer_credentials: Optional[HTTPAuthorizationCredentials] = Depends(
+        bearer_security
+    ),
+) -> Identity:
+    """
+    Return identity of current user.
+
+    Signed bearer tokens are checked against cached user state, Basic
+    credentials fall back to user lookup. Identity is authenticated once per
+    request and kept in `request.state`.
+    """
+    identity = getattr(request.state, "identity", None)
+    if identity is not None:
+        return identity
+    if bearer_credentials is not None:
+        identity = user_service.authenticate_token(token=bearer_credentials.credentials)
+    elif basic_credentials is not None:
+        user = user_service.authenticate(
+            username=basic_credentials.username, password=basic_credentials.password
+        )
+        request.state.user = user
+        identity = Identity(id=user.id, is_active=not user.disabled)
+    else:
+        raise HTTPException(
+            status_code=HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Basic"},
+        )
+    request.state.identity = identity
+    return identity
 
 
 def get_current_user(
+    request: Request,
     user_service: UserService = Depends(),
-    credentials: HTTPBasicCredentials = Depends(basic_security),
+    identity: Identity = Depends(get_current_identity),
 ) -> User:
     """
     Return current user.
+
+    `User` row is loaded once per request and shared by every dependency.
     """
-    user = user_service.authenticate(
-        username=credentials.username, password=credentials.password
-    )
+    user = getattr(request.state, "user", None)
+    if user is None:
+        user = user_service.get_user_by_id(user_id=identity.id)
+        if not user:
+            raise UserNotFoundException(
+                message="User not found", status_code=HTTP_401_UNAUTHORIZED
+            )
+        request.state.user = user
     return user
 
 
-def get_current_task(
-    task_id: str,
-    repo: TasksRepository = Depends(get_tasks_repository),
-    current_user: User = Depends(get_current_user),
+def get_current_active_identity(
+    identity: Identity = Depends(get_current_identity),
+) -> Identity:
+    """
+    Return identity of current active user.
+    """
+    if not identity.is_active:
+        raise InactiveUserAccountException(
+            message="Inactive user", status_code=HTTP_400_BAD_REQUEST
+        )
+    return identity
+
+
+async def get_current_task(
+    task_id: int,
+    repo: TasksRepositoryType = Depends(tasks_repository),
+    current_user: Identity = Depends(get_current_identity),
 ) -> Task:
     """
     Check if task with `task_id` exists in database.
     """
-    task = repo.get(obj_id=task_id)
+    task = await call_repo(repo.get, obj_id=task_id)
     if not task:
         raise TaskNotFoundException(
             message=f"Task with id `{task_id}` not found",
@@ -53,15 +137,94 @@ def get_current_task(
     return task
 
 
-def get_current_active_user(
-    user_service: UserService = Depends(),
-    current_user: User = Depends(get_current_user),
-) -> User:
+def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """
     Return current active user.
     """
-    if not user_service.check_is_active(user=current_user):
+    if current_user.disabled:
         raise InactiveUserAccountException(
             message="Inactive user", status_code=HTTP_400_BAD_REQUEST
         )
     return current_user
+
+
+def is_json_content_type(content_type: str) -> bool:
+    """
+    Check if media type is JSON, as FastAPI parses request bodies.
+    """
+    media_type = content_type.partition(";")[0].strip().lower()
+    main_type, _, subtype = media_type.partition("/")
+    return main_type == "application" and (
+        subtype == "json" or subtype.endswith("+json")
+    )
+
+
+async def get_json_body(request: Request) -> Any:
+    """
+    Return parsed JSON body, `None` if body is empty or not JSON.
+
+    Route parses the body first and validates it after dependencies, so JSON
+    is read from cache and invalid bodies are reported by the route.
+    """
+    content_type = request.headers.get("content-type")
+    if content_type and not is_json_content_type(content_type):
+        return None
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+async def check_batch_size(request: Request) -> None:
+    """
+    Check if bulk request fits into configured batch size.
+
+    Runs before body items are validated, so oversized batches are rejected
+    without building models for each item.
+    """
+    items = await get_json_body(request)
+    max_batch_size = get_app_settings().bulk_max_batch_size
+    if isinstance(items, list) and len(items) > max_batch_size:
+        raise BatchSizeLimitException(
+            message=f"Batch size exceeds limit of {max_batch_size} items",
+            status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+
+async def get_rate_limit_keys(request: Request, keys: Sequence[str]) -> List[str]:
+    """
+    Return values of `keys` identifying client, `ip` or `username` from body.
+    """
+    values = []
+    if "ip" in keys and request.client:
+        values.append(f"ip:{request.client.host}")
+    if "username" in keys:
+        body = await get_json_body(request)
+        if isinstance(body, dict) and isinstance(body.get("username"), str):
+            values.append(f"username:{body['username']}")
+    return values
+
+
+def rate_limit(route: str, keys: Sequence[str] = ("ip",)) -> Callable:
+    """
+    Return dependency limiting requests to `route` per client.
+
+    Every key has its own token bucket with limit of `route` in settings, and
+    request is rejected with `429` when any of them is empty.
+    """
+
+    async def dependency(request: Request) -> None:
+        limit = get_app_settings().rate_limits.get(route)
+        if not limit:
+            return
+        backend = get_rate_limit_backend()
+        for key in await get_rate_limit_keys(request, keys=keys):
+            wait = backend.hit(f"{route}:{key}", limit=RateLimit(*limit))
+            if wait:
+                raise RateLimitExceededException(
+                    message="Too many requests, retry later",
+                    status_code=HTTP_429_TOO_MANY_REQUESTS,
+                    headers={"Retry-After": str(get_retry_after(wait))},
+                )
+
+    return dependency
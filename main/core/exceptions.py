@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
@@ -27,9 +27,12 @@ class BaseInternalException(Exception):
     Base error class for inherit all internal errors.
     """
 
-    def __init__(self, message: str, status_code: int) -> None:
+    def __init__(
+        self, message: str, status_code: int, headers: Optional[Dict[str, str]] = None
+    ) -> None:
         self.message = message
         self.status_code = status_code
+        self.headers = headers
 
 
 class TaskNotFoundException(BaseInternalException):
@@ -68,6 +71,30 @@ class UserPermissionException(BaseInternalException):
     """
 
 
+class TaskVersionConflictException(BaseInternalException):
+    """
+    Exception raised when task was changed since version from `If-Match` header.
+    """
+
+
+class BatchSizeLimitException(BaseInternalException):
+    """
+    Exception raised when bulk request contains too many items.
+    """
+
+
+class InvalidCursorException(BaseInternalException):
+    """
+    Exception raised when pagination cursor can not be decoded.
+    """
+
+
+class RateLimitExceededException(BaseInternalException):
+    """
+    Exception raised when client sends more requests than route allows.
+    """
+
+
 def add_internal_exception_handler(app: FastAPI) -> None:
     """
     Handle all internal exceptions.
@@ -85,6 +112,7 @@ def add_internal_exception_handler(app: FastAPI) -> None:
                 "type": type(exc).__name__,
                 "message": exc.message,
             },
+            headers=exc.headers,
         )
 
 
@@ -143,6 +171,7 @@ def add_http_exception_handler(app: FastAPI) -> None:
                 "type": "HTTPException",
                 "message": exc.detail,
             },
+            headers=getattr(exc, "headers", None),
         )
 
 
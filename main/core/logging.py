@@ -1,12 +1,30 @@
 """
 Module configuration custom logger.
 """
+import atexit
+import copy
+import json
 import logging
-from typing import List, Optional
+import random
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Any, Dict, List, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 DEFAULT_LOGGER_NAME = "fastapi-todo"
 
 LOG_MESSAGE_FORMAT = "[%(name)s] [%(asctime)s] %(message)s"
+REQUEST_LOG_MESSAGE_FORMAT = "[%(name)s] [%(asctime)s] [%(request_id)s] %(message)s"
+
+REQUEST_ID_HEADER = "X-Request-ID"
+REQUEST_ID_MAX_LENGTH = 128
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
 
 
 class ProjectLogger:
@@ -33,6 +51,8 @@ class ProjectLogger:
     def create_logger(self) -> logging.Logger:
         """
         Return configured logger.
+
+        Handlers set here are replaced by `setup_logging` on application start.
         """
         logging.basicConfig(format=LOG_MESSAGE_FORMAT)
 
@@ -49,4 +69,205 @@ def create_logger(name: str = DEFAULT_LOGGER_NAME) -> logging.Logger:
     return ProjectLogger(name=name)()
 
 
+def get_logger(name: str) -> logging.Logger:
+    """
+    Return child of project logger, to set level or sampling of it separately.
+    """
+    return logging.getLogger(f"{DEFAULT_LOGGER_NAME}.{name}")
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Add id of current request to log records.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get() or "-"  # type: ignore
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a share of info and debug records of configured loggers.
+
+    `rates` maps logger name to kept share, applied to its children too.
+    """
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+        self._logger_rates: Dict[str, float] = {}
+
+    def get_rate(self, name: str) -> float:
+        if name not in self._logger_rates:
+            rate = 1.0
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix, _, _ = prefix.rpartition(".")
+            self._logger_rates[name] = rate
+        return self._logger_rates[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self.get_rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format log records as JSON lines.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class LocalQueueHandler(QueueHandler):
+    """
+    Put records to in-process queue, leaving formatting to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Arguments are merged here, as they may change after the call returns.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(
+    level: int,
+    log_format: str = "text",
+    use_queue: bool = True,
+    sampling: Optional[Dict[str, float]] = None,
+    debug_sql: bool = False,
+) -> None:
+    """
+    Configure root logger, replacing previously configured handlers.
+
+    With `use_queue` records are written to stderr by a background thread, so
+    logging never blocks request workers on I/O.
+    """
+    global _listener
+    stop_logging()
+
+    handler: logging.Handler = logging.StreamHandler()
+    handler.setFormatter(
+        JsonFormatter()
+        if log_format == "json"
+        else logging.Formatter(REQUEST_LOG_MESSAGE_FORMAT)
+    )
+    if use_queue:
+        log_queue: SimpleQueue = SimpleQueue()
+        _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        handler = LocalQueueHandler(log_queue)
+    filters: List[logging.Filter] = [RequestIdFilter()]
+    if sampling:
+        filters.insert(0, SamplingFilter(rates=sampling))
+    for log_filter in filters:
+        handler.addFilter(log_filter)
+
+    root_logger = logging.getLogger()
+    for root_handler in root_logger.handlers[:]:
+        root_logger.removeHandler(root_handler)
+    root_logger.addHandler(handler)
+    # Third-party loggers keep default `WARNING` level of root logger.
+    root_logger.setLevel(max(level, logging.WARNING))
+    logging.getLogger(DEFAULT_LOGGER_NAME).setLevel(level)
+    # Replaces engine `echo`, that writes to stdout synchronously.
+    logging.getLogger("sqlalchemy.engine").setLevel(
+        logging.INFO if debug_sql else logging.WARNING
+    )
+
+
+def stop_logging() -> None:
+    """
+    Flush queued records and stop background logging thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+def restart_logging_after_fork() -> None:
+    """
+    Start logging thread again in forked process, as threads are not copied.
+    """
+    global _listener
+    if _listener is not None:
+        _listener = QueueListener(
+            _listener.queue,
+            *_listener.handlers,
+            respect_handler_level=_listener.respect_handler_level,
+        )
+        _listener.start()
+
+
+def get_request_id(scope: Scope) -> str:
+    """
+    Return request id from `X-Request-ID` header or a new one.
+    """
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
+            if 0 < len(value) <= REQUEST_ID_MAX_LENGTH:
+                return value.decode("latin-1")
+            break
+    return uuid.uuid4().hex
+
+
+class RequestIdMiddleware:
+    """
+    Bind request id to log records and return it in response header.
+
+    Id is taken from `X-Request-ID` request header or generated.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        value = get_request_id(scope)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, value)
+            await send(message)
+
+        token = request_id.set(value)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id.reset(token)
+
+
 logger = create_logger()
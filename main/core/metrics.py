@@ -0,0 +1,373 @@
+"""
+Module with per-request instrumentation.
+
+Request latency, SQL statements and password hashing time are collected into
+Prometheus metrics and reported back to clients in `Server-Timing` header.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetrics:
+    """
+    Time spent by single request in database and password hashing.
+    """
+
+    __slots__ = ("db_statements", "db_time", "hashing_time")
+
+    def __init__(self) -> None:
+        self.db_statements = 0
+        self.db_time = 0.0
+        self.hashing_time = 0.0
+
+    def server_timing(self, total_time: float) -> str:
+        """
+        Return `Server-Timing` header value, durations are in milliseconds.
+        """
+        timings = [
+            f"app;dur={total_time * 1000:.2f}",
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.db_statements} statements"',
+        ]
+        if self.hashing_time:
+            timings.append(f"hash;dur={self.hashing_time * 1000:.2f}")
+        return ", ".join(timings)
+
+
+# Set only while instrumented request is processed.
+request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{0}="{1}"'.format(
+            name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}"
+
+
+class Counter:
+    """
+    Monotonic counter in Prometheus text format.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def collect(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{format_labels(self.labels, labels)} {value}"
+
+
+class Gauge(Counter):
+    """
+    Current value in Prometheus text format.
+    """
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    """
+    Cumulative histogram in Prometheus text format.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per labels: counts of each bucket and `+Inf`, then sum of values.
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            counts, total = self._values.setdefault(
+                labels, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    def collect(self) -> Iterator[str]:
+        with self._lock:
+            values = [
+                (labels, list(counts), total[0])
+                for labels, (counts, total) in self._values.items()
+            ]
+        names = self.labels + ("le",)
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield (
+                    f"{self.name}_bucket{format_labels(names, labels + (le,))} "
+                    f"{cumulative}"
+                )
+            yield f"{self.name}_count{format_labels(self.labels, labels)} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labels, labels)} {total}"
+
+
+class MetricsRegistry:
+    """
+    Application metrics rendered for Prometheus scraping.
+    """
+
+    def __init__(self) -> None:
+        route_labels = ("method", "route")
+        self.request_duration = Histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency.",
+            labels=route_labels + ("status",),
+        )
+        self.db_statements = Counter(
+            "http_request_db_statements_total",
+            "SQL statements executed while processing HTTP requests.",
+            labels=route_labels,
+        )
+        self.db_duration = Counter(
+            "http_request_db_duration_seconds_total",
+            "Time spent executing SQL statements while processing HTTP requests.",
+            labels=route_labels,
+        )
+        self.hashing_duration = Counter(
+            "http_request_password_hashing_duration_seconds_total",
+            "Time spent hashing passwords while processing HTTP requests.",
+            labels=route_labels,
+        )
+        self.admission_wait = Histogram(
+            "http_request_admission_wait_seconds",
+            "Time requests waited for admission.",
+            labels=("priority",),
+        )
+        self.admission_shed = Counter(
+            "http_requests_shed_total",
+            "Requests rejected by admission control.",
+            labels=("priority",),
+        )
+        self.admission_in_flight = Gauge(
+            "http_requests_in_flight", "Requests admitted and not finished yet."
+        )
+
+    @property
+    def metrics(self) -> List[Any]:
+        return [
+            self.request_duration,
+            self.db_statements,
+            self.db_duration,
+            self.hashing_duration,
+            self.admission_wait,
+            self.admission_shed,
+            self.admission_in_flight,
+        ]
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        duration: float,
+        metrics: RequestMetrics,
+    ) -> None:
+        self.request_duration.observe(duration, method, route, str(status_code))
+        self.db_statements.inc(metrics.db_statements, method, route)
+        self.db_duration.inc(metrics.db_time, method, route)
+        if metrics.hashing_time:
+            self.hashing_duration.inc(metrics.hashing_time, method, route)
+
+    def observe_admission(
+        self, priority: str, wait: float, admitted: bool, in_flight: int
+    ) -> None:
+        self.admission_wait.observe(wait, priority)
+        if not admitted:
+            self.admission_shed.inc(1, priority)
+        self.admission_in_flight.set(in_flight)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+@lru_cache
+def get_metrics_registry() -> MetricsRegistry:
+    return MetricsRegistry()
+
+
+@contextmanager
+def track_hashing() -> Iterator[None]:
+    """
+    Add time spent in the block to password hashing time of current request.
+    """
+    metrics = request_metrics.get()
+    if metrics is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.hashing_time += time.perf_counter() - started_at
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *args: Any
+) -> None:
+    if request_metrics.get() is not None:
+        context._metrics_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *args: Any
+) -> None:
+    metrics = request_metrics.get()
+    started_at = getattr(context, "_metrics_started_at", None)
+    if metrics is not None and started_at is not None:
+        metrics.db_statements += 1
+        metrics.db_time += time.perf_counter() - started_at
+
+
+def instrument_engine(engine: Union[Engine, Type[Engine]]) -> None:
+    """
+    Count SQL statements and their execution time of instrumented requests.
+
+    Pass `Engine` class to instrument engines created later, asyncio included.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def get_route_path(scope: Scope, cache: Dict[Callable, str]) -> str:
+    """
+    Return path template of the route matched by request, to bound labels.
+    """
+    endpoint = scope.get("endpoint")
+    router = scope.get("router")
+    if endpoint is None or router is None:
+        return UNMATCHED_ROUTE
+    if endpoint not in cache:
+        for route in router.routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                cache[endpoint] = route.path
+                break
+        else:
+            cache[endpoint] = UNMATCHED_ROUTE
+    return cache[endpoint]
+
+
+class MetricsMiddleware:
+    """
+    Measure HTTP requests and add `Server-Timing` header to responses.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry) -> None:
+        self.app = app
+        self.registry = registry
+        self._route_paths: Dict[Callable, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    metrics.server_timing(time.perf_counter() - started_at),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_metrics.reset(token)
+            self.registry.observe_request(
+                method=scope["method"],
+                route=get_route_path(scope, cache=self._route_paths),
+                status_code=status_code,
+                duration=time.perf_counter() - started_at,
+                metrics=metrics,
+            )
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """
+    Expose collected metrics in Prometheus text format.
+    """
+    return PlainTextResponse(
+        get_metrics_registry().render(), media_type=PROMETHEUS_CONTENT_TYPE
+    )
@@ -0,0 +1,118 @@
+"""
+Module with token bucket rate limiting primitives.
+"""
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
+
+from main.core.config import get_app_settings
+
+
+class RateLimit(NamedTuple):
+    """
+    Allow `requests` requests per `period` seconds, all of them at once too.
+    """
+
+    requests: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.period
+
+
+class RateLimitBackend(ABC):
+    """
+    Interface of token bucket store, counting requests per key.
+
+    Implement it to plug in a store shared by all workers, as every worker
+    limits requests separately with the in-process one.
+    """
+
+    @abstractmethod
+    def hit(self, key: str, limit: RateLimit) -> float:
+        """
+        Take a token from bucket of `key`.
+
+        Return `0` if request is allowed, otherwise seconds until it is.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Drop all buckets.
+        """
+
+    @abstractmethod
+    def stats(self) -> Dict[str, float]:
+        """
+        Return number of stored buckets.
+        """
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    In-process token buckets, keeping up to `maxsize` keys.
+
+    Buckets refilled to capacity equal missing ones, so they are evicted once
+    idle long enough, and least recently used ones are evicted over `maxsize`.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        # Per key: tokens left, time of last update and time bucket is full.
+        self._buckets: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens = float(limit.requests)
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                left, updated_at, _ = bucket
+                tokens = min(tokens, left + (now - updated_at) * limit.rate)
+            if tokens < 1:
+                return (1 - tokens) / limit.rate
+            tokens -= 1
+            self._buckets[key] = (
+                tokens,
+                now,
+                now + (limit.requests - tokens) / limit.rate,
+            )
+            self._buckets.move_to_end(key)
+            self._evict(now)
+            return 0.0
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            _, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at > now and len(self._buckets) <= self.maxsize:
+                break
+            self._buckets.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, float]:
+        return {"size": len(self._buckets), "maxsize": self.maxsize}
+
+
+def get_retry_after(wait: float) -> int:
+    """
+    Return `Retry-After` header value for wait in seconds.
+    """
+    return max(math.ceil(wait), 1)
+
+
+@lru_cache
+def get_rate_limit_backend() -> RateLimitBackend:
+    """
+    Return backend storing rate limit buckets.
+    """
+    return MemoryRateLimitBackend(maxsize=get_app_settings().rate_limit_store_size)
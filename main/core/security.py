@@ -1,22 +1,275 @@
+import asyncio
 import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, NamedTuple, Optional
 
-from passlib.context import CryptContext
+from main.core.cache import TTLCache
+from main.core.config import get_app_settings
+from main.core.metrics import track_hashing
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+
+class CachedCredentials(NamedTuple):
+    digest: bytes
+    hashed_password: str
+
+
+class CredentialsCache:
+    """
+    Cache of successfully verified credentials.
+
+    Entries are stored per user id and hold a keyed digest of the credentials,
+    so plain passwords never stay in memory after the request.
+
+    Entries are checked against password hash of the user row loaded by the
+    request, so password changes made by any worker invalidate them. Active
+    state is not cached, it is read from the same row.
+    """
+
+    def __init__(self, secret_key: str, maxsize: int, ttl: float) -> None:
+        self._secret_key = secret_key.encode()
+        self._cache: TTLCache[int, CachedCredentials] = TTLCache(
+            maxsize=maxsize, ttl=ttl
+        )
+
+    def _digest(self, user_id: int, password: str) -> bytes:
+        message = f"{user_id}:{password}".encode()
+        return hmac.new(self._secret_key, message, hashlib.sha256).digest()
+
+    def get(
+        self, user_id: int, password: str, hashed_password: str
+    ) -> Optional[CachedCredentials]:
+        """
+        Return cached entry if credentials were verified for the current hash.
+        """
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return None
+        if entry.hashed_password != hashed_password:
+            # Password was changed since verification, e.g. by another worker.
+            self._cache.delete(user_id)
+            return None
+        if not hmac.compare_digest(entry.digest, self._digest(user_id, password)):
+            return None
+        return entry
+
+    def add(self, user_id: int, password: str, hashed_password: str) -> None:
+        """
+        Remember successfully verified credentials.
+        """
+        entry = CachedCredentials(
+            digest=self._digest(user_id, password), hashed_password=hashed_password
+        )
+        self._cache.set(user_id, entry)
+
+    def clear(self) -> None:
+        """
+        Drop all cached credentials.
+        """
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return cache hit/miss counters.
+        """
+        return self._cache.stats()
+
+
+@lru_cache
+def get_credentials_cache() -> CredentialsCache:
+    """
+    Return verified credentials cache.
+    """
+    settings = get_app_settings()
+    return CredentialsCache(
+        secret_key=settings.secret_key,
+        maxsize=settings.credentials_cache_size,
+        ttl=settings.credentials_cache_ttl,
+    )
+
+
+class Identity(NamedTuple):
+    id: int
+    is_active: bool
+
+
+class TokenState(NamedTuple):
+    """
+    User state checked by signed access tokens.
+    """
+
+    is_active: bool
+    tokens_valid_after: Optional[float]
+
+    def is_revoked(self, issued_at: float) -> bool:
+        """
+        Check if token issued at `issued_at` Unix time was revoked.
+        """
+        return (
+            self.tokens_valid_after is not None and issued_at < self.tokens_valid_after
+        )
+
+
+@lru_cache
+def get_token_state_cache() -> TTLCache[int, TokenState]:
+    """
+    Return cache of user states by user id, checked by access tokens.
+
+    States changed by other workers are seen after `token_state_cache_ttl`.
+    """
+    settings = get_app_settings()
+    return TTLCache(
+        maxsize=settings.token_state_cache_size, ttl=settings.token_state_cache_ttl
+    )
+
+
+class TokenPayload(NamedTuple):
+    user_id: int
+    is_active: bool
+    token_type: str
+    issued_at: float
+    expires_at: float
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(message: str) -> str:
+    secret_key = get_app_settings().secret_key.encode()
+    return _b64encode(hmac.new(secret_key, message.encode(), hashlib.sha256).digest())
+
+
+def create_token(user_id: int, is_active: bool, token_type: str, ttl: float) -> str:
+    """
+    Return HMAC signed token carrying user id and active flag.
+    """
+    issued_at = time.time()
+    payload = {
+        "sub": user_id,
+        "act": is_active,
+        "typ": token_type,
+        "iat": issued_at,
+        "exp": issued_at + ttl,
+    }
+    message = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    return f"{message}.{_sign(message)}"
+
+
+def decode_token(token: str, token_type: str) -> Optional[TokenPayload]:
+    """
+    Return token payload if signature is valid and token is not expired.
+    """
+    message, _, signature = token.partition(".")
+    if not hmac.compare_digest(signature.encode(), _sign(message).encode()):
+        return None
+    try:
+        data = json.loads(_b64decode(message))
+        payload = TokenPayload(
+            user_id=int(data["sub"]),
+            is_active=bool(data["act"]),
+            token_type=str(data["typ"]),
+            issued_at=float(data["iat"]),
+            expires_at=float(data["exp"]),
+        )
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        return None
+    if payload.token_type != token_type or payload.expires_at <= time.time():
+        return None
+    return payload
+
+
+@lru_cache
+def get_pwd_context() -> "CryptContext":
+    """
+    Return password hashing context, built on first use to keep imports fast.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def get_password_hash(password: str) -> str:
     """
     Convert user password to hash string.
     """
-    return pwd_context.hash(secret=password)
+    with track_hashing():
+        return get_pwd_context().hash(secret=password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Check if the user password from request is valid.
     """
-    return pwd_context.verify(secret=plain_password, hash=hashed_password)
+    with track_hashing():
+        return get_pwd_context().verify(secret=plain_password, hash=hashed_password)
+
+
+@lru_cache
+def get_hashing_executor() -> Executor:
+    """
+    Return executor dedicated to CPU heavy password hashing.
+    """
+    settings = get_app_settings()
+    if settings.password_hashing_executor == "process":
+        return ProcessPoolExecutor(max_workers=settings.password_hashing_workers)
+    return ThreadPoolExecutor(
+        max_workers=settings.password_hashing_workers,
+        thread_name_prefix="password-hashing",
+    )
+
+
+def shutdown_hashing_executor() -> None:
+    """
+    Stop password hashing workers if executor was created.
+    """
+    if get_hashing_executor.cache_info().currsize:
+        get_hashing_executor().shutdown(wait=False)
+        get_hashing_executor.cache_clear()
+
+
+def reset_hashing_executor_after_fork() -> None:
+    """
+    Forget executor created by parent process, its workers are not copied.
+    """
+    get_hashing_executor.cache_clear()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Convert user password to hash string in password hashing executor.
+    """
+    loop = asyncio.get_running_loop()
+    with track_hashing():
+        return await loop.run_in_executor(
+            get_hashing_executor(), get_password_hash, password
+        )
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Check if the user password is valid in password hashing executor.
+    """
+    loop = asyncio.get_running_loop()
+    with track_hashing():
+        return await loop.run_in_executor(
+            get_hashing_executor(), verify_password, plain_password, hashed_password
+        )
 
 
 def get_basic_auth_token(username: str, password: str) -> str:
@@ -1,5 +1,6 @@
 import logging
-from typing import Any, Dict, List
+import os
+from typing import Any, Dict, List, Literal, Tuple
 
 from main.core.settings.base import BaseAppSettings
 from version import response
@@ -20,15 +21,83 @@ class AppSettings(BaseAppSettings):
 
     secret_key: str
 
+    # In-process cache is per worker, writes of other workers are seen after
+    # `cache_ttl` only, so it is off unless a shared backend is plugged in.
+    cache_size: int = 0
+    cache_ttl: int = 60
+
+    credentials_cache_size: int = 1024
+    credentials_cache_ttl: int = 300
+
+    access_token_ttl: int = 900
+    refresh_token_ttl: int = 86400
+    # Access tokens see user revocation and disabling of other workers after it.
+    token_state_cache_ttl: int = 5
+    token_state_cache_size: int = 10000
+
+    password_hashing_executor: Literal["thread", "process"] = "thread"
+    password_hashing_workers: int = 2
+
     api_prefix: str = "/api/v1"
 
     allowed_hosts: List[str] = ["*"]
 
+    server_host: str = "0.0.0.0"
+    server_port: int = 5000
+    # Number of worker processes, CPU count when 0.
+    server_workers: int = 0
+    server_keepalive: int = 5
+    server_backlog: int = 2048
+    server_timeout: int = 60
+    server_graceful_timeout: int = 30
+    server_preload: bool = True
+    # Proxies trusted to pass client address in `X-Forwarded-For`, which rate
+    # limits are keyed on. Comma separated addresses, `*` trusts any.
+    server_forwarded_allow_ips: str = "127.0.0.1"
+    threadpool_size: int = 40
+    # Concurrent requests per router, routers without limit share the threadpool.
+    router_concurrency_limits: Dict[str, int] = {"user": 10, "tasks": 25}
+    # Requests processed at once, the excess waits in queue or is shed, 0 disables.
+    admission_max_in_flight: int = 100
+    admission_max_queue: int = 100
+    admission_queue_timeout: float = 2.0
+    # Share of in-flight limit each priority may fill, lower ones are shed first.
+    admission_priority_shares: Dict[str, float] = {
+        "high": 1.0,
+        "normal": 0.8,
+        "low": 0.5,
+    }
+    admission_retry_after: int = 1
+
+    # Requests per period in seconds allowed for each client of a route.
+    rate_limits: Dict[str, Tuple[int, float]] = {
+        "login": (10, 60),
+        "register": (10, 3600),
+    }
+    rate_limit_store_size: int = 100000
+
+    bulk_max_batch_size: int = 500
+    export_chunk_size: int = 1000
+    tasks_count_limit: int = 10000
+
     logging_level: int = logging.INFO
+    logging_format: Literal["text", "json"] = "text"
+    logging_queue: bool = True
+    # Kept share of info records per logger name, e.g. `{"fastapi-todo.user": 0.1}`.
+    logging_sampling: Dict[str, float] = {}
+
+    metrics_enabled: bool = False
+    # Expose pool and cache usage on `/status/pool` and `/status/cache`.
+    internal_status_enabled: bool = False
 
     database_url: str
+    # Serve user and task routes over asyncio engine instead of threadpool.
+    async_database: bool = False
     min_connection_count: int = 5
     max_connection_count: int = 10
+    pool_pre_ping: bool = True
+    pool_recycle: int = 1800
+    pool_timeout: int = 30
 
     class Config:
         validate_assignment = True
@@ -44,3 +113,19 @@ class AppSettings(BaseAppSettings):
             "title": self.title,
             "version": self.version,
         }
+
+    @property
+    def server_workers_count(self) -> int:
+        return self.server_workers or os.cpu_count() or 1
+
+    @property
+    def database_pool_kwargs(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.min_connection_count,
+            "max_overflow": max(
+                self.max_connection_count - self.min_connection_count, 0
+            ),
+            "pool_pre_ping": self.pool_pre_ping,
+            "pool_recycle": self.pool_recycle,
+            "pool_timeout": self.pool_timeout,
+        }
@@ -0,0 +1,33 @@
+"""Add task owner indexes
+
+Revision ID: 3c9a1e7b5d42
+Revises: dfb75cfbf652
+Create Date: 2026-10-18 10:12:41.503127
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c9a1e7b5d42"
+down_revision = "dfb75cfbf652"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Primary keys are already indexed.
+    op.drop_index(op.f("ix_task_id"), table_name="task")
+    op.drop_index(op.f("ix_user_id"), table_name="user")
+    op.create_index(
+        op.f("ix_task_owner_id_id"), "task", ["owner_id", "id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_task_owner_id_done"), "task", ["owner_id", "done"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_task_owner_id_done"), table_name="task")
+    op.drop_index(op.f("ix_task_owner_id_id"), table_name="task")
+    op.create_index(op.f("ix_user_id"), "user", ["id"], unique=False)
+    op.create_index(op.f("ix_task_id"), "task", ["id"], unique=False)
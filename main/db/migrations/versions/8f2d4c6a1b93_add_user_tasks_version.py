@@ -0,0 +1,27 @@
+"""Add user tasks version
+
+Revision ID: 8f2d4c6a1b93
+Revises: 3c9a1e7b5d42
+Create Date: 2026-10-18 13:02:17.214563
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8f2d4c6a1b93"
+down_revision = "3c9a1e7b5d42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "user",
+        sa.Column("tasks_version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.drop_column("tasks_version")
@@ -0,0 +1,26 @@
+"""Add task version
+
+Revision ID: b7e3a9d1c254
+Revises: 8f2d4c6a1b93
+Create Date: 2026-10-18 13:41:05.887402
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7e3a9d1c254"
+down_revision = "8f2d4c6a1b93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "task", sa.Column("version", sa.Integer(), server_default="1", nullable=False)
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("task") as batch_op:
+        batch_op.drop_column("version")
@@ -0,0 +1,24 @@
+"""Add user tokens valid after
+
+Revision ID: c5d8e2f4a716
+Revises: e41c7f2a9b60
+Create Date: 2026-10-18 18:41:05.320971
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c5d8e2f4a716"
+down_revision = "e41c7f2a9b60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("user", sa.Column("tokens_valid_after", sa.Float(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.drop_column("tokens_valid_after")
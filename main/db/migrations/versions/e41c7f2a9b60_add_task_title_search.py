@@ -0,0 +1,55 @@
+"""Add task title search
+
+Revision ID: e41c7f2a9b60
+Revises: b7e3a9d1c254
+Create Date: 2026-10-18 15:02:37.118204
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e41c7f2a9b60"
+down_revision = "b7e3a9d1c254"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect_name = op.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_task_title_search ON task "
+            "USING gin (to_tsvector('simple'::regconfig, coalesce(title, '')))"
+        )
+    elif dialect_name == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts "
+            "USING fts5(title, content='task', content_rowid='id')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+            "INSERT INTO task_fts(rowid, title) VALUES (new.id, new.title); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+            "INSERT INTO task_fts(task_fts, rowid, title) "
+            "VALUES ('delete', old.id, old.title); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title ON task "
+            "BEGIN "
+            "INSERT INTO task_fts(task_fts, rowid, title) "
+            "VALUES ('delete', old.id, old.title); "
+            "INSERT INTO task_fts(rowid, title) VALUES (new.id, new.title); END"
+        )
+        op.execute("INSERT INTO task_fts(rowid, title) SELECT id, title FROM task")
+
+
+def downgrade():
+    dialect_name = op.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_task_title_search")
+    elif dialect_name == "sqlite":
+        for trigger in ("task_fts_ai", "task_fts_ad", "task_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS task_fts")
@@ -0,0 +1,92 @@
+"""
+Module with instrumented connection pools.
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool  # type: ignore
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """
+    Counters of connection checkouts from the pool.
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, wait_time: float, timed_out: bool = False) -> None:
+        """
+        Record time spent waiting for a connection.
+        """
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+    def as_dict(self) -> Dict[str, float]:
+        attempts = self.checkouts + self.timeouts
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_time_total": self.wait_time_total,
+            "wait_time_avg": self.wait_time_total / attempts if attempts else 0.0,
+            "wait_time_max": self.wait_time_max,
+        }
+
+
+class InstrumentedPoolMixin:
+    """
+    Measure how long callers wait for a connection checkout.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self) -> Any:
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()  # type: ignore
+        except PoolTimeoutError:
+            self.metrics.observe(time.perf_counter() - started_at, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - started_at)
+        return connection
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    ...
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    ...
+
+
+def get_pool_status(engine: Engine) -> Dict[str, Any]:
+    """
+    Return current pool usage and checkout wait statistics.
+    """
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, InstrumentedPoolMixin):
+        status.update(pool.metrics.as_dict())
+    return status
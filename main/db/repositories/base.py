@@ -1,9 +1,27 @@
-from typing import Generic, List, Optional, Type, TypeVar
+import inspect as pyinspect
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
 
-from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, inspect, select, update
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
+from starlette.concurrency import run_in_threadpool
 
+from main.core.cache import CacheBackend
 from main.db.base_class import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -11,20 +29,160 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
-class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+async def call_repo(method: Callable[..., Any], **kwargs: Any) -> Any:
+    """
+    Call method of sync or asyncio repository without blocking the event loop.
+
+    Methods of asyncio repositories are awaited, sync ones run in threadpool.
+    """
+    if pyinspect.iscoroutinefunction(method):
+        return await method(**kwargs)
+    return await run_in_threadpool(method, **kwargs)
+
+
+class ModelMixin(Generic[ModelType]):
+    """
+    Repository part working with specific SQLAlchemy model.
+    """
+
+    model: Type[ModelType]
+
+
+class ReturningMixin(ModelMixin[ModelType]):
+    """
+    Build single round-trip write statements returning model rows.
+    """
+
+    @staticmethod
+    def dialect_supports_returning(dialect: Dialect) -> bool:
+        """
+        Check if database supports `RETURNING` for insert, update and delete.
+        """
+        return bool(getattr(dialect, "full_returning", False))
+
+    def filter_columns(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Drop values which do not map to table columns.
+        """
+        columns = self.model.__table__.columns.keys()
+        return {field: value for field, value in values.items() if field in columns}
+
+    def insert_returning(
+        self, values: Union[Dict[str, Any], List[Dict[str, Any]]]
+    ) -> Any:
+        statement = (
+            insert(self.model)  # type: ignore
+            .values(values)
+            .returning(*self.model.__table__.columns)
+        )
+        return select(self.model).from_statement(statement)  # type: ignore
+
+    def update_returning(self, obj_id: Any, values: Dict[str, Any]) -> Any:
+        statement = (
+            update(self.model)  # type: ignore
+            .where(self.model.id == obj_id)
+            .values(**values)
+            .returning(*self.model.__table__.columns)
+        )
+        return (
+            select(self.model)  # type: ignore
+            .from_statement(statement)
+            .execution_options(populate_existing=True)
+        )
+
+    def delete_by_id(self, obj_id: Any) -> Any:
+        return delete(self.model).where(self.model.id == obj_id)  # type: ignore
+
+    def delete_returning(self, obj_id: Any) -> Any:
+        statement = self.delete_by_id(obj_id=obj_id).returning(
+            *self.model.__table__.columns
+        )
+        return select(self.model).from_statement(statement)  # type: ignore
+
+
+class CacheMixin(ModelMixin[ModelType]):
+    """
+    Keep column values of rows read by `id` in cache backend.
+    """
+
+    cache: Optional[CacheBackend]
+
+    def cache_key(self, obj_id: Any) -> str:
+        return f"{self.model.__table__.name}:{obj_id}"
+
+    def get_cached(self, obj_id: Any) -> Optional[ModelType]:
+        """
+        Return detached object built from cached column values.
+        """
+        if self.cache is None:
+            return None
+        values = self.cache.get(self.cache_key(obj_id))
+        if values is None:
+            return None
+        obj = inspect(self.model).class_manager.new_instance()
+        for field, value in values.items():
+            set_committed_value(obj, field, value)
+        make_transient_to_detached(obj)
+        return obj
+
+    def get_generation(self, obj_id: Any) -> Optional[int]:
+        """
+        Return cache generation of row, taken before the row is read.
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get_generation(self.cache_key(obj_id))
+
+    def set_cached(self, obj: ModelType, generation: Optional[int] = None) -> None:
+        """
+        Put column values of loaded object to cache.
+
+        Skipped if the row was invalidated since `generation`, as the object may
+        be older than a write committed meanwhile.
+        """
+        if self.cache is None:
+            return
+        values = {
+            column.key: getattr(obj, column.key)
+            for column in inspect(self.model).column_attrs
+        }
+        self.cache.set(self.cache_key(obj.id), values, generation=generation)
+
+    def invalidate(self, obj_ids: Iterable[Any]) -> None:
+        """
+        Drop cached rows with `obj_ids`.
+        """
+        if self.cache is None:
+            return
+        self.cache.delete_many(self.cache_key(obj_id) for obj_id in obj_ids)
+
+
+class BaseRepository(
+    ReturningMixin[ModelType],
+    CacheMixin[ModelType],
+    Generic[ModelType, CreateSchemaType, UpdateSchemaType],
+):
     """
     Base repository with basic methods.
     """
 
-    def __init__(self, db: Session, model: Type[ModelType]) -> None:
+    def __init__(
+        self, db: Session, model: Type[ModelType], cache: Optional[CacheBackend] = None
+    ) -> None:
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
 
         :param db: A SQLAlchemy Session object.
         :param model: A SQLAlchemy model class.
+        :param cache: Optional cache backend for reads by `id`.
         """
         self.db = db
         self.model = model
+        self.cache = cache
+
+    @property
+    def supports_returning(self) -> bool:
+        return self.dialect_supports_returning(dialect=self.db.get_bind().dialect)
 
     def get_all(self) -> List[ModelType]:
         """
@@ -32,41 +190,253 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         return self.db.query(self.model).all()
 
-    def get(self, obj_id: str) -> Optional[ModelType]:
+    def get(self, obj_id: Any) -> Optional[ModelType]:
         """
-        Get object by `id` field.
+        Get object by `id` field, reading through the cache if configured.
         """
-        return self.db.query(self.model).filter(self.model.id == obj_id).first()
+        cached = self.get_cached(obj_id=obj_id)
+        if cached is not None:
+            return self.db.merge(cached, load=False)
+        generation = self.get_generation(obj_id=obj_id)
+        obj = self.db.query(self.model).filter(self.model.id == obj_id).first()
+        if obj is not None:
+            self.set_cached(obj=obj, generation=generation)
+        return obj
 
     def create(self, obj_create: CreateSchemaType) -> ModelType:
         """
         Create new object in db table.
         """
-        obj = self.model(**obj_create.dict())
-        self.db.add(obj)
-        self.db.commit()
-        self.db.refresh(obj)
-        return obj
+        return self.insert_values(values=obj_create.dict())
 
-    def update(self, obj: ModelType, obj_update: UpdateSchemaType) -> ModelType:
+    def update(
+        self, obj: ModelType, obj_update: UpdateSchemaType
+    ) -> Optional[ModelType]:
         """
         Update model object by fields from `obj_update` schema.
         """
-        obj_data = jsonable_encoder(obj)
-        update_data = obj_update.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(obj, field, update_data[field])
-        self.db.add(obj)
+        return self.update_values(obj=obj, values=obj_update.dict(exclude_unset=True))
+
+    def delete(self, obj_id: int) -> Optional[ModelType]:
+        """
+        Delete object, return `None` if there is no row with `obj_id`.
+        """
+        if self.supports_returning:
+            result = self.db.execute(self.delete_returning(obj_id=obj_id))
+            obj = result.scalar_one_or_none()
+        else:
+            # Object may come from stale cache, so deleted rows are counted.
+            obj = self.db.query(self.model).get(obj_id)
+            result = self.db.execute(
+                self.delete_by_id(obj_id=obj_id).execution_options(
+                    synchronize_session=False
+                )
+            )
+            if obj is not None:
+                self.db.expunge(obj)
+            if not result.rowcount:
+                obj = None
+        if obj is not None:
+            self.on_write(objs=[obj])
         self.db.commit()
-        self.db.refresh(obj)
+        self.invalidate(obj_ids=[obj_id])
         return obj
 
-    def delete(self, obj_id: int) -> Optional[ModelType]:
+    def insert_values(self, values: Dict[str, Any]) -> ModelType:
         """
-        Delete object.
+        Insert new row using `INSERT ... RETURNING` when database supports it.
         """
-        obj = self.db.query(self.model).get(obj_id)
-        self.db.delete(obj)
+        if self.supports_returning:
+            result = self.db.execute(self.insert_returning(values=values))
+            obj = result.scalar_one()
+        else:
+            obj = self.model(**values)
+            self.db.add(obj)
+        self.on_write(objs=[obj])
         self.db.commit()
+        self.invalidate(obj_ids=[obj.id])
         return obj
+
+    def update_values(
+        self, obj: ModelType, values: Dict[str, Any]
+    ) -> Optional[ModelType]:
+        """
+        Update row using `UPDATE ... RETURNING` when database supports it.
+
+        Return `None` if the row was deleted meanwhile.
+        """
+        values = self.filter_columns(values=values)
+        if not values:
+            return obj
+        obj_id = obj.id
+        updated: Optional[ModelType] = obj
+        if self.supports_returning:
+            result = self.db.execute(
+                self.update_returning(obj_id=obj_id, values=values)
+            )
+            updated = result.scalar_one_or_none()
+        else:
+            for field, value in values.items():
+                setattr(obj, field, value)
+            self.db.add(obj)
+        if updated is not None:
+            self.on_write(objs=[updated])
+        try:
+            self.db.commit()
+        except StaleDataError:
+            self.db.rollback()
+            updated = None
+        self.invalidate(obj_ids=[obj_id])
+        return updated
+
+    def on_write(self, objs: List[ModelType]) -> None:
+        """
+        Hook called with changed objects before the write is committed.
+        """
+
+
+class AsyncBaseRepository(
+    ReturningMixin[ModelType],
+    CacheMixin[ModelType],
+    Generic[ModelType, CreateSchemaType, UpdateSchemaType],
+):
+    """
+    Base repository with basic methods working over asyncio session.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        model: Type[ModelType],
+        cache: Optional[CacheBackend] = None,
+    ) -> None:
+        """
+        CRUD object with default async methods to Create, Read, Update, Delete.
+
+        :param db: A SQLAlchemy AsyncSession object.
+        :param model: A SQLAlchemy model class.
+        :param cache: Optional cache backend for reads by `id`.
+        """
+        self.db = db
+        self.model = model
+        self.cache = cache
+
+    @property
+    def supports_returning(self) -> bool:
+        return self.dialect_supports_returning(dialect=self.db.get_bind().dialect)
+
+    async def get_all(self) -> List[ModelType]:
+        """
+        Return all objects from specific db table.
+        """
+        result = await self.db.execute(select(self.model))  # type: ignore
+        return result.scalars().all()
+
+    async def get(self, obj_id: Any) -> Optional[ModelType]:
+        """
+        Get object by `id` field, reading through the cache if configured.
+        """
+        cached = self.get_cached(obj_id=obj_id)
+        if cached is not None:
+            return await self.db.merge(cached, load=False)
+        generation = self.get_generation(obj_id=obj_id)
+        result = await self.db.execute(
+            select(self.model).where(self.model.id == obj_id)  # type: ignore
+        )
+        obj = result.scalars().first()
+        if obj is not None:
+            self.set_cached(obj=obj, generation=generation)
+        return obj
+
+    async def create(self, obj_create: CreateSchemaType) -> ModelType:
+        """
+        Create new object in db table.
+        """
+        return await self.insert_values(values=obj_create.dict())
+
+    async def update(
+        self, obj: ModelType, obj_update: UpdateSchemaType
+    ) -> Optional[ModelType]:
+        """
+        Update model object by fields from `obj_update` schema.
+        """
+        return await self.update_values(
+            obj=obj, values=obj_update.dict(exclude_unset=True)
+        )
+
+    async def delete(self, obj_id: int) -> Optional[ModelType]:
+        """
+        Delete object, return `None` if there is no row with `obj_id`.
+        """
+        if self.supports_returning:
+            result = await self.db.execute(self.delete_returning(obj_id=obj_id))
+            obj = result.scalar_one_or_none()
+        else:
+            # Object may come from stale cache, so deleted rows are counted.
+            obj = await self.db.get(self.model, obj_id)
+            result = await self.db.execute(
+                self.delete_by_id(obj_id=obj_id).execution_options(
+                    synchronize_session=False
+                )
+            )
+            if obj is not None:
+                self.db.expunge(obj)
+            if not result.rowcount:
+                obj = None
+        if obj is not None:
+            await self.on_write(objs=[obj])
+        await self.db.commit()
+        self.invalidate(obj_ids=[obj_id])
+        return obj
+
+    async def insert_values(self, values: Dict[str, Any]) -> ModelType:
+        """
+        Insert new row using `INSERT ... RETURNING` when database supports it.
+        """
+        if self.supports_returning:
+            result = await self.db.execute(self.insert_returning(values=values))
+            obj = result.scalar_one()
+        else:
+            obj = self.model(**values)
+            self.db.add(obj)
+        await self.on_write(objs=[obj])
+        await self.db.commit()
+        self.invalidate(obj_ids=[obj.id])
+        return obj
+
+    async def update_values(
+        self, obj: ModelType, values: Dict[str, Any]
+    ) -> Optional[ModelType]:
+        """
+        Update row using `UPDATE ... RETURNING` when database supports it.
+
+        Return `None` if the row was deleted meanwhile.
+        """
+        values = self.filter_columns(values=values)
+        if not values:
+            return obj
+        obj_id = obj.id
+        updated: Optional[ModelType] = obj
+        if self.supports_returning:
+            result = await self.db.execute(
+                self.update_returning(obj_id=obj_id, values=values)
+            )
+            updated = result.scalar_one_or_none()
+        else:
+            for field, value in values.items():
+                setattr(obj, field, value)
+            self.db.add(obj)
+        if updated is not None:
+            await self.on_write(objs=[updated])
+        try:
+            await self.db.commit()
+        except StaleDataError:
+            await self.db.rollback()
+            updated = None
+        self.invalidate(obj_ids=[obj_id])
+        return updated
+
+    async def on_write(self, objs: List[ModelType]) -> None:
+        """
+        Hook called with changed objects before the write is committed.
+        """
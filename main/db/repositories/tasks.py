@@ -1,59 +1,755 @@
-from typing import List
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from fastapi import Depends
+from sqlalchemy import and_, bindparam, case, delete, func, or_, select, update
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from main.core.config import get_app_settings
-from main.db.repositories.base import BaseRepository
-from main.db.session import get_db
+from main.core.cache import get_cache_backend
+from main.db.repositories.base import AsyncBaseRepository, BaseRepository, ModelMixin
+from main.db.search import apply_search, get_search_score, get_search_terms
+from main.db.session import get_async_db, get_db
 from main.models.task import Task
-from main.schemas.tasks import TaskInCreate, TaskInUpdate
+from main.models.user import User
+from main.schemas.tasks import TaskInBulkUpdate, TaskInCreate, TaskInUpdate, TasksFilter
 
-settings = get_app_settings()
 
+def bump_tasks_version(owner_ids: Iterable[int]) -> Any:
+    """
+    Build statement incrementing tasks version of users with `owner_ids`.
+    """
+    users = User.__table__
+    return (
+        update(users)
+        .where(users.c.id.in_(list(owner_ids)))
+        .values(tasks_version=users.c.tasks_version + 1)
+    )
+
+
+class TasksQueryMixin(ModelMixin[Task]):
+    """
+    Build task statements shared by sync and asyncio repositories.
+    """
+
+    def select_fields(self, fields: Sequence[str]) -> Any:
+        return select(*(getattr(self.model, field) for field in fields))
+
+    def filter_by_owner(
+        self, statement: Any, *, owner_id: int, filters: Optional[TasksFilter] = None
+    ) -> Any:
+        """
+        Filter `statement` by task owner and optional task filters.
+        """
+        statement = statement.where(self.model.owner_id == owner_id)
+        if filters is None:
+            return statement
+        if filters.done is not None:
+            statement = statement.where(self.model.done == filters.done)
+        if filters.title_prefix:
+            statement = statement.where(
+                self.model.title.startswith(filters.title_prefix, autoescape=True)
+            )
+        if filters.title_contains:
+            statement = statement.where(
+                func.lower(self.model.title).contains(
+                    filters.title_contains.lower(), autoescape=True
+                )
+            )
+        if filters.id_gte is not None:
+            statement = statement.where(self.model.id >= filters.id_gte)
+        if filters.id_lte is not None:
+            statement = statement.where(self.model.id <= filters.id_lte)
+        return statement
+
+    def page_by_owner(
+        self,
+        statement: Any,
+        *,
+        owner_id: int,
+        skip: int,
+        limit: int,
+        after_id: Optional[int],
+        filters: Optional[TasksFilter] = None,
+    ) -> Any:
+        """
+        Filter `statement` by task owner and apply key or offset pagination.
+        """
+        statement = self.filter_by_owner(
+            statement, owner_id=owner_id, filters=filters
+        ).order_by(self.model.id)
+        if after_id is not None:
+            statement = statement.where(self.model.id > after_id)
+        else:
+            statement = statement.offset(skip)
+        return statement.limit(limit)
+
+    def select_search_by_owner(
+        self,
+        *,
+        dialect: Dialect,
+        owner_id: int,
+        fields: Sequence[str],
+        text: str,
+        limit: int,
+        after: Optional[Tuple[float, int]],
+    ) -> Any:
+        """
+        Build full-text search over titles, `None` if `text` has no terms.
+        """
+        terms = get_search_terms(text)
+        if not terms:
+            return None
+        score = get_search_score(dialect_name=dialect.name, terms=terms)
+        statement = apply_search(
+            select(  # type: ignore
+                *(getattr(self.model, field) for field in fields), score.label("score")
+            ),
+            dialect_name=dialect.name,
+            terms=terms,
+        )
+        statement = self.filter_by_owner(statement, owner_id=owner_id)
+        if after is not None:
+            after_score, after_id = after
+            statement = statement.where(
+                or_(
+                    score < after_score,
+                    and_(score == after_score, self.model.id > after_id),
+                )
+            )
+        return statement.order_by(score.desc(), self.model.id).limit(limit)
+
+    def select_count_by_owner(
+        self, *, owner_id: int, limit: int, filters: Optional[TasksFilter] = None
+    ) -> Any:
+        """
+        Build count of tasks of specific user, scanning at most `limit` + 1 rows.
+        """
+        subquery = (
+            self.filter_by_owner(
+                select(self.model.id),  # type: ignore
+                owner_id=owner_id,
+                filters=filters,
+            )
+            .limit(limit + 1)
+            .subquery()
+        )
+        return select(func.count()).select_from(subquery)
+
+    def select_stats_by_owner(self, *, owner_id: int) -> Any:
+        return select(
+            func.count(),
+            func.coalesce(func.sum(case([(self.model.done, 1)], else_=0)), 0),
+        ).where(self.model.owner_id == owner_id)
+
+    def select_stream_by_owner(self, *, owner_id: int, fields: Sequence[str]) -> Any:
+        return (
+            self.select_fields(fields)
+            .where(self.model.owner_id == owner_id)
+            .order_by(self.model.id)
+        )
+
+    def select_by_owner(self, *, obj_ids: Iterable[int], owner_id: int) -> Any:
+        return (
+            select(self.model)  # type: ignore
+            .where(self.model.owner_id == owner_id)
+            .where(self.model.id.in_(list(obj_ids)))
+        )
+
+    def delete_by_owner(self, *, obj_ids: Iterable[int], owner_id: int) -> Any:
+        return (
+            delete(self.model)  # type: ignore
+            .where(self.model.owner_id == owner_id)
+            .where(self.model.id.in_(list(obj_ids)))
+            .execution_options(synchronize_session=False)
+        )
+
+    def update_if_version_statement(
+        self, *, obj_id: int, values: Dict[str, Any], version: int
+    ) -> Any:
+        """
+        Build `UPDATE ... WHERE id = ? AND version = ?` incrementing version.
+        """
+        return (
+            update(self.model)  # type: ignore
+            .where(self.model.id == obj_id)
+            .where(self.model.version == version)
+            .values(**values, version=self.model.version + 1)
+        )
+
+    def update_many_statement(
+        self, updates: Dict[int, Dict[str, Any]]
+    ) -> Tuple[Any, List[Dict[str, Any]]]:
+        """
+        Build executemany `UPDATE` of tasks by `id` with its parameters.
+        """
+        fields = list(TaskInUpdate.__fields__)
+        table = self.model.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                {
+                    **{field: bindparam(f"b_{field}") for field in fields},
+                    "version": table.c.version + 1,
+                }
+            )
+        )
+        params = [
+            {"b_id": obj_id, **{f"b_{field}": values[field] for field in fields}}
+            for obj_id, values in updates.items()
+        ]
+        return statement, params
+
+    @staticmethod
+    def select_version(owner_id: int) -> Any:
+        return select(User.tasks_version).where(User.id == owner_id)  # type: ignore
+
+    @staticmethod
+    def get_owner_values(
+        objs_create: List[TaskInCreate], owner_id: int
+    ) -> List[Dict[str, Any]]:
+        return [{**obj.dict(), "owner_id": owner_id} for obj in objs_create]
+
+    @staticmethod
+    def get_owned_updates(
+        objs_update: List[TaskInBulkUpdate], owned_ids: Iterable[int]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Return update values by `id` of tasks in `owned_ids`.
+        """
+        owned = set(owned_ids)
+        return {
+            obj_update.id: obj_update.dict(exclude={"id"})
+            for obj_update in objs_update
+            if obj_update.id in owned
+        }
+
+    @staticmethod
+    def get_count_result(count: Optional[int], limit: int) -> Tuple[int, bool]:
+        count = count or 0
+        return min(count, limit), count <= limit
 
-class TasksRepository(BaseRepository[Task, TaskInCreate, TaskInUpdate]):
+    @staticmethod
+    def get_stats_result(total: int, done: int) -> Dict[str, int]:
+        return {"total": total, "done": done, "undone": total - done}
+
+
+class TasksRepository(
+    TasksQueryMixin, BaseRepository[Task, TaskInCreate, TaskInUpdate]
+):
     """
     Repository to manipulate with the task.
     """
 
     def get_all_by_owner(
-        self, *, owner_id: int, skip: int = 0, limit: int = 100
+        self,
+        *,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+        filters: Optional[TasksFilter] = None,
     ) -> List[Task]:
         """
         Get all tasks created by specific user with id `owner_id`.
+
+        Tasks are ordered by `id`, pass `after_id` to page by key instead of offset.
         """
-        return (
-            self.db.query(self.model)
-            .filter(Task.owner_id == owner_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        statement = self.page_by_owner(
+            select(self.model),  # type: ignore
+            owner_id=owner_id,
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
+            filters=filters,
+        )
+        return self.db.execute(statement).scalars().all()
+
+    def get_rows_by_owner(
+        self,
+        *,
+        owner_id: int,
+        fields: Sequence[str],
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+        filters: Optional[TasksFilter] = None,
+    ) -> List[Any]:
+        """
+        Get `fields` of tasks created by specific user as row tuples.
+
+        Same as `get_all_by_owner`, but skips building ORM objects.
+        """
+        statement = self.page_by_owner(
+            self.select_fields(fields),
+            owner_id=owner_id,
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
+            filters=filters,
+        )
+        return self.db.execute(statement).all()
+
+    def search_by_owner(
+        self,
+        *,
+        owner_id: int,
+        fields: Sequence[str],
+        text: str,
+        limit: int = 100,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Any]:
+        """
+        Full-text search over titles of tasks created by specific user.
+
+        Rows are ordered by relevance `score`, pass `score` and `id` of the last
+        row as `after` to get the next page.
+        """
+        statement = self.select_search_by_owner(
+            dialect=self.db.get_bind().dialect,
+            owner_id=owner_id,
+            fields=fields,
+            text=text,
+            limit=limit,
+            after=after,
+        )
+        if statement is None:
+            return []
+        return self.db.execute(statement).all()
+
+    def count_by_owner(
+        self, *, owner_id: int, limit: int, filters: Optional[TasksFilter] = None
+    ) -> Tuple[int, bool]:
+        """
+        Count tasks of specific user, scanning at most `limit` + 1 rows.
+
+        Return count and flag if it is exact, count over `limit` is cut to `limit`.
+        """
+        statement = self.select_count_by_owner(
+            owner_id=owner_id, limit=limit, filters=filters
         )
+        return self.get_count_result(self.db.execute(statement).scalar(), limit=limit)
+
+    def get_stats_by_owner(self, *, owner_id: int) -> Dict[str, int]:
+        """
+        Return total, done and undone task counts of specific user in one query.
+        """
+        statement = self.select_stats_by_owner(owner_id=owner_id)
+        return self.get_stats_result(*self.db.execute(statement).one())
+
+    def stream_by_owner(
+        self, *, owner_id: int, fields: Sequence[str], chunk_size: int = 1000
+    ) -> Iterator[Any]:
+        """
+        Iterate over `fields` of all tasks created by specific user.
+
+        Rows are fetched with server-side cursor by `chunk_size` rows at a time.
+        """
+        statement = self.select_stream_by_owner(owner_id=owner_id, fields=fields)
+        result = self.db.execute(statement.execution_options(stream_results=True))
+        return iter(result.yield_per(chunk_size))
 
     def create_with_owner(self, *, obj_create: TaskInCreate, owner_id: int) -> Task:
         """
         Create new task by specific user with id `owner_id`.
         """
-        obj = self.model(**obj_create.dict(), owner_id=owner_id)
-        self.db.add(obj)
+        return self.insert_values(values={**obj_create.dict(), "owner_id": owner_id})
+
+    def create_many_with_owner(
+        self, *, objs_create: List[TaskInCreate], owner_id: int
+    ) -> List[Task]:
+        """
+        Create new tasks by specific user in a single transaction.
+
+        Uses multi-row `INSERT ... RETURNING` when database supports it.
+        """
+        values = self.get_owner_values(objs_create=objs_create, owner_id=owner_id)
+        if not values:
+            return []
+        if self.supports_returning:
+            result = self.db.execute(self.insert_returning(values=values))
+            objs = result.scalars().all()
+        else:
+            objs = [self.model(**obj_values) for obj_values in values]
+            self.db.add_all(objs)
+        self.bump_version(owner_ids=[owner_id])
+        self.db.commit()
+        self.invalidate(obj_ids=[obj.id for obj in objs])
+        return objs
+
+    def update_values(self, obj: Task, values: Dict[str, Any]) -> Optional[Task]:
+        """
+        Update task row, incrementing its `version`.
+        """
+        values = self.filter_columns(values=values)
+        if not values:
+            return obj
+        return super().update_values(
+            obj=obj, values={**values, "version": Task.version + 1}
+        )
+
+    def update_if_version(
+        self, *, obj: Task, obj_update: TaskInUpdate, version: int
+    ) -> Optional[Task]:
+        """
+        Update task only if its current `version` is still `version`.
+
+        Conditional `UPDATE ... WHERE id = ? AND version = ?` needs no row
+        locks, `None` is returned if task was changed by another request.
+        """
+        statement = self.update_if_version_statement(
+            obj_id=obj.id,
+            values=self.filter_columns(values=obj_update.dict(exclude_unset=True)),
+            version=version,
+        )
+        if self.supports_returning:
+            result = self.db.execute(
+                select(self.model)  # type: ignore
+                .from_statement(statement.returning(*self.model.__table__.columns))
+                .execution_options(populate_existing=True)
+            )
+            updated = result.scalar_one_or_none()
+        else:
+            result = self.db.execute(
+                statement.execution_options(synchronize_session=False)
+            )
+            updated = obj if result.rowcount else None
+        if updated is not None:
+            self.on_write(objs=[updated])
         self.db.commit()
-        self.db.refresh(obj)
-        return obj
+        # Cached row is stale on conflict as well.
+        self.invalidate(obj_ids=[obj.id])
+        if updated is not None and not self.supports_returning:
+            self.db.refresh(updated)
+        return updated
+
+    def update_many_by_owner(
+        self, *, objs_update: List[TaskInBulkUpdate], owner_id: int
+    ) -> Dict[int, Task]:
+        """
+        Update tasks of specific user in a single transaction.
+
+        Return updated tasks by `id`, tasks of other owners are skipped.
+        Task versions are incremented, so updated rows are read back once.
+        """
+        result = self.db.execute(
+            self.select_by_owner(
+                obj_ids=[obj.id for obj in objs_update], owner_id=owner_id
+            )
+        )
+        objs = {obj.id: obj for obj in result.scalars()}
+        updates = self.get_owned_updates(objs_update=objs_update, owned_ids=objs)
+        if not updates:
+            return objs
+        self.db.execute(*self.update_many_statement(updates=updates))
+        self.bump_version(owner_ids=[owner_id])
+        self.db.commit()
+        self.invalidate(obj_ids=updates)
+        result = self.db.execute(
+            select(self.model)  # type: ignore
+            .where(self.model.id.in_(list(updates)))
+            .execution_options(populate_existing=True)
+        )
+        return {obj.id: obj for obj in result.scalars()}
 
     def delete_many_by_owner(self, obj_ids: List[int], owner_id: int) -> List[int]:
         """
         Bulk delete objects.
         """
-        query = (
-            self.db.query(self.model)
-            .filter(Task.owner_id == owner_id)
-            .filter(self.model.id.in_(obj_ids))
+        result = self.db.execute(
+            self.delete_by_owner(obj_ids=obj_ids, owner_id=owner_id)
         )
-        query.delete(synchronize_session=False)
+        if result.rowcount:
+            self.bump_version(owner_ids=[owner_id])
         self.db.commit()
+        self.invalidate(obj_ids=obj_ids)
+        return obj_ids
+
+    def get_version(self, owner_id: int) -> int:
+        """
+        Return version of tasks of specific user, changed on every write.
+        """
+        return self.db.execute(self.select_version(owner_id=owner_id)).scalar() or 0
+
+    def bump_version(self, owner_ids: Iterable[int]) -> None:
+        """
+        Increment tasks version of users in the current transaction.
+        """
+        self.db.execute(bump_tasks_version(owner_ids=owner_ids))
+
+    def on_write(self, objs: List[Task]) -> None:
+        self.bump_version(
+            owner_ids={obj.owner_id for obj in objs if obj.owner_id is not None}
+        )
+
+
+class AsyncTasksRepository(
+    TasksQueryMixin, AsyncBaseRepository[Task, TaskInCreate, TaskInUpdate]
+):
+    """
+    Repository to manipulate with the task over asyncio session.
+    """
+
+    async def get_all_by_owner(
+        self,
+        *,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+        filters: Optional[TasksFilter] = None,
+    ) -> List[Task]:
+        """
+        Get all tasks created by specific user with id `owner_id`.
+        """
+        statement = self.page_by_owner(
+            select(self.model),  # type: ignore
+            owner_id=owner_id,
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
+            filters=filters,
+        )
+        result = await self.db.execute(statement)
+        return result.scalars().all()
+
+    async def get_rows_by_owner(
+        self,
+        *,
+        owner_id: int,
+        fields: Sequence[str],
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+        filters: Optional[TasksFilter] = None,
+    ) -> List[Any]:
+        """
+        Get `fields` of tasks created by specific user as row tuples.
+        """
+        statement = self.page_by_owner(
+            self.select_fields(fields),
+            owner_id=owner_id,
+            skip=skip,
+            limit=limit,
+            after_id=after_id,
+            filters=filters,
+        )
+        result = await self.db.execute(statement)
+        return result.all()
+
+    async def search_by_owner(
+        self,
+        *,
+        owner_id: int,
+        fields: Sequence[str],
+        text: str,
+        limit: int = 100,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Any]:
+        """
+        Full-text search over titles of tasks created by specific user.
+        """
+        statement = self.select_search_by_owner(
+            dialect=self.db.get_bind().dialect,
+            owner_id=owner_id,
+            fields=fields,
+            text=text,
+            limit=limit,
+            after=after,
+        )
+        if statement is None:
+            return []
+        result = await self.db.execute(statement)
+        return result.all()
+
+    async def count_by_owner(
+        self, *, owner_id: int, limit: int, filters: Optional[TasksFilter] = None
+    ) -> Tuple[int, bool]:
+        """
+        Count tasks of specific user, scanning at most `limit` + 1 rows.
+        """
+        result = await self.db.execute(
+            self.select_count_by_owner(owner_id=owner_id, limit=limit, filters=filters)
+        )
+        return self.get_count_result(result.scalar(), limit=limit)
+
+    async def get_stats_by_owner(self, *, owner_id: int) -> Dict[str, int]:
+        """
+        Return total, done and undone task counts of specific user in one query.
+        """
+        result = await self.db.execute(self.select_stats_by_owner(owner_id=owner_id))
+        return self.get_stats_result(*result.one())
+
+    async def stream_by_owner(
+        self, *, owner_id: int, fields: Sequence[str], chunk_size: int = 1000
+    ) -> AsyncIterator[Any]:
+        """
+        Iterate over `fields` of all tasks created by specific user.
+
+        Rows are fetched with server-side cursor by `chunk_size` rows at a time.
+        """
+        statement = self.select_stream_by_owner(owner_id=owner_id, fields=fields)
+        return await self.db.stream(
+            statement.execution_options(max_row_buffer=chunk_size)
+        )
+
+    async def create_with_owner(
+        self, *, obj_create: TaskInCreate, owner_id: int
+    ) -> Task:
+        """
+        Create new task by specific user with id `owner_id`.
+        """
+        return await self.insert_values(
+            values={**obj_create.dict(), "owner_id": owner_id}
+        )
+
+    async def create_many_with_owner(
+        self, *, objs_create: List[TaskInCreate], owner_id: int
+    ) -> List[Task]:
+        """
+        Create new tasks by specific user in a single transaction.
+        """
+        values = self.get_owner_values(objs_create=objs_create, owner_id=owner_id)
+        if not values:
+            return []
+        if self.supports_returning:
+            result = await self.db.execute(self.insert_returning(values=values))
+            objs = result.scalars().all()
+        else:
+            objs = [self.model(**obj_values) for obj_values in values]
+            self.db.add_all(objs)
+        await self.bump_version(owner_ids=[owner_id])
+        await self.db.commit()
+        self.invalidate(obj_ids=[obj.id for obj in objs])
+        return objs
+
+    async def update_values(self, obj: Task, values: Dict[str, Any]) -> Optional[Task]:
+        """
+        Update task row, incrementing its `version`.
+        """
+        values = self.filter_columns(values=values)
+        if not values:
+            return obj
+        updated = await super().update_values(
+            obj=obj, values={**values, "version": Task.version + 1}
+        )
+        if updated is not None and not self.supports_returning:
+            # Incremented version is expired, lazy loads do not work over asyncio.
+            await self.db.refresh(updated)
+        return updated
+
+    async def update_if_version(
+        self, *, obj: Task, obj_update: TaskInUpdate, version: int
+    ) -> Optional[Task]:
+        """
+        Update task only if its current `version` is still `version`.
+        """
+        statement = self.update_if_version_statement(
+            obj_id=obj.id,
+            values=self.filter_columns(values=obj_update.dict(exclude_unset=True)),
+            version=version,
+        )
+        if self.supports_returning:
+            result = await self.db.execute(
+                select(self.model)  # type: ignore
+                .from_statement(statement.returning(*self.model.__table__.columns))
+                .execution_options(populate_existing=True)
+            )
+            updated = result.scalar_one_or_none()
+        else:
+            result = await self.db.execute(
+                statement.execution_options(synchronize_session=False)
+            )
+            updated = obj if result.rowcount else None
+        if updated is not None:
+            await self.on_write(objs=[updated])
+        await self.db.commit()
+        # Cached row is stale on conflict as well.
+        self.invalidate(obj_ids=[obj.id])
+        if updated is not None and not self.supports_returning:
+            await self.db.refresh(updated)
+        return updated
+
+    async def update_many_by_owner(
+        self, *, objs_update: List[TaskInBulkUpdate], owner_id: int
+    ) -> Dict[int, Task]:
+        """
+        Update tasks of specific user in a single transaction.
+        """
+        result = await self.db.execute(
+            self.select_by_owner(
+                obj_ids=[obj.id for obj in objs_update], owner_id=owner_id
+            )
+        )
+        objs = {obj.id: obj for obj in result.scalars()}
+        updates = self.get_owned_updates(objs_update=objs_update, owned_ids=objs)
+        if not updates:
+            return objs
+        await self.db.execute(*self.update_many_statement(updates=updates))
+        await self.bump_version(owner_ids=[owner_id])
+        await self.db.commit()
+        self.invalidate(obj_ids=updates)
+        result = await self.db.execute(
+            select(self.model)  # type: ignore
+            .where(self.model.id.in_(list(updates)))
+            .execution_options(populate_existing=True)
+        )
+        return {obj.id: obj for obj in result.scalars()}
+
+    async def delete_many_by_owner(
+        self, obj_ids: List[int], owner_id: int
+    ) -> List[int]:
+        """
+        Bulk delete objects.
+        """
+        result = await self.db.execute(
+            self.delete_by_owner(obj_ids=obj_ids, owner_id=owner_id)
+        )
+        if result.rowcount:
+            await self.bump_version(owner_ids=[owner_id])
+        await self.db.commit()
+        self.invalidate(obj_ids=obj_ids)
         return obj_ids
 
+    async def get_version(self, owner_id: int) -> int:
+        """
+        Return version of tasks of specific user, changed on every write.
+        """
+        result = await self.db.execute(self.select_version(owner_id=owner_id))
+        return result.scalar() or 0
+
+    async def bump_version(self, owner_ids: Iterable[int]) -> None:
+        """
+        Increment tasks version of users in the current transaction.
+        """
+        await self.db.execute(bump_tasks_version(owner_ids=owner_ids))
+
+    async def on_write(self, objs: List[Task]) -> None:
+        await self.bump_version(
+            owner_ids={obj.owner_id for obj in objs if obj.owner_id is not None}
+        )
+
+
+TasksRepositoryType = Union[TasksRepository, AsyncTasksRepository]
+
 
 def get_tasks_repository(session: Session = Depends(get_db)) -> TasksRepository:
-    return TasksRepository(db=session, model=Task)
+    return TasksRepository(db=session, model=Task, cache=get_cache_backend())
+
+
+def get_async_tasks_repository(
+    session: AsyncSession = Depends(get_async_db),
+) -> AsyncTasksRepository:
+    return AsyncTasksRepository(db=session, model=Task, cache=get_cache_backend())
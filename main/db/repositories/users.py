@@ -1,16 +1,16 @@
 from typing import Optional
 
 from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from main.core.config import get_app_settings
-from main.db.repositories.base import BaseRepository
-from main.db.session import get_db
+from main.core.security import get_password_hash, get_password_hash_async
+from main.db.repositories.base import AsyncBaseRepository, BaseRepository
+from main.db.session import get_async_db, get_db
 from main.models.user import User
 from main.schemas.user import UserInCreate, UserInUpdate
 
-settings = get_app_settings()
-
 
 class UsersRepository(BaseRepository[User, UserInCreate, UserInUpdate]):
     """
@@ -23,6 +23,88 @@ class UsersRepository(BaseRepository[User, UserInCreate, UserInUpdate]):
         """
         return self.db.query(User).filter(User.username == username).first()
 
+    def create(self, obj_create: UserInCreate) -> User:
+        """
+        Create new user, hashing password in the current thread.
+        """
+        return self.create_with_password(
+            obj_create=obj_create,
+            hashed_password=get_password_hash(password=obj_create.password),
+        )
+
+    def create_with_password(
+        self, *, obj_create: UserInCreate, hashed_password: str
+    ) -> User:
+        """
+        Create new user with already hashed password.
+        """
+        values = obj_create.dict(exclude={"password"})
+        return self.insert_values(values={**values, "hashed_password": hashed_password})
+
+    def disable(self, obj_id: int, revoked_at: float) -> Optional[User]:
+        """
+        Disable user and revoke tokens issued before `revoked_at` in one update.
+        """
+        user = self.get(obj_id=obj_id)
+        if user is None:
+            return None
+        return self.update_values(
+            obj=user, values={"disabled": True, "tokens_valid_after": revoked_at}
+        )
+
+    @staticmethod
+    def is_active(user: User) -> bool:
+        """
+        Check if user is active.
+        """
+        return not user.disabled
+
+
+class AsyncUsersRepository(AsyncBaseRepository[User, UserInCreate, UserInUpdate]):
+    """
+    Repository to manipulate with the user over asyncio session.
+    """
+
+    async def get_by_username(self, username: str) -> Optional[User]:
+        """
+        Get user by `username` field.
+        """
+        result = await self.db.execute(
+            select(self.model).where(self.model.username == username)  # type: ignore
+        )
+        return result.scalars().first()
+
+    async def create(self, obj_create: UserInCreate) -> User:
+        """
+        Create new user, hashing password in password hashing executor.
+        """
+        return await self.create_with_password(
+            obj_create=obj_create,
+            hashed_password=await get_password_hash_async(password=obj_create.password),
+        )
+
+    async def create_with_password(
+        self, *, obj_create: UserInCreate, hashed_password: str
+    ) -> User:
+        """
+        Create new user with already hashed password.
+        """
+        values = obj_create.dict(exclude={"password"})
+        return await self.insert_values(
+            values={**values, "hashed_password": hashed_password}
+        )
+
+    async def disable(self, obj_id: int, revoked_at: float) -> Optional[User]:
+        """
+        Disable user and revoke tokens issued before `revoked_at` in one update.
+        """
+        user = await self.get(obj_id=obj_id)
+        if user is None:
+            return None
+        return await self.update_values(
+            obj=user, values={"disabled": True, "tokens_valid_after": revoked_at}
+        )
+
     @staticmethod
     def is_active(user: User) -> bool:
         """
@@ -33,3 +115,9 @@ class UsersRepository(BaseRepository[User, UserInCreate, UserInUpdate]):
 
 def get_users_repository(session: Session = Depends(get_db)) -> UsersRepository:
     return UsersRepository(db=session, model=User)
+
+
+def get_async_users_repository(
+    session: AsyncSession = Depends(get_async_db),
+) -> AsyncUsersRepository:
+    return AsyncUsersRepository(db=session, model=User)
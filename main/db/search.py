@@ -0,0 +1,93 @@
+"""
+Module with full-text search over task titles.
+
+PostgreSQL uses GIN index over `to_tsvector` of the title, SQLite falls back to
+FTS5 external content table kept in sync by triggers.
+"""
+from typing import Any, List
+
+from sqlalchemy import DDL, Float, cast, column, event, func, literal_column, table
+
+SEARCH_CONFIG = "simple"
+
+# Must match the indexed expression exactly to let the planner use the index.
+TITLE_DOCUMENT = func.to_tsvector(
+    literal_column(f"'{SEARCH_CONFIG}'::regconfig"),
+    func.coalesce(literal_column("task.title"), literal_column("''")),
+)
+
+POSTGRESQL_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_task_title_search ON task "
+    f"USING gin (to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(title, '')))"
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts "
+    "USING fts5(title, content='task', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title) "
+    "VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title) "
+    "VALUES ('delete', old.id, old.title); "
+    "INSERT INTO task_fts(rowid, title) VALUES (new.id, new.title); END",
+]
+
+SQLITE_DROP_DDL = ["DROP TABLE IF EXISTS task_fts"]
+
+task_fts = table("task_fts", column("rowid"))
+
+
+def add_search_ddl_listeners(task_table: Any) -> None:
+    """
+    Create search structures along with `task` table by `metadata.create_all`.
+    """
+    ddl_events = (
+        ("after_create", "postgresql", POSTGRESQL_DDL),
+        ("after_create", "sqlite", SQLITE_DDL),
+        ("before_drop", "sqlite", SQLITE_DROP_DDL),
+    )
+    for event_name, dialect, statements in ddl_events:
+        for statement in statements:
+            ddl = DDL(statement).execute_if(dialect=dialect)  # type: ignore
+            event.listen(task_table, event_name, ddl)
+
+
+def get_search_terms(text: str) -> List[str]:
+    return text.split()
+
+
+def to_fts5_query(terms: List[str]) -> str:
+    """
+    Return FTS5 query matching all terms, quoted to disable query syntax.
+    """
+    return " ".join('"{0}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def get_tsquery(terms: List[str]) -> Any:
+    return func.plainto_tsquery(
+        literal_column(f"'{SEARCH_CONFIG}'::regconfig"), " ".join(terms)
+    )
+
+
+def get_search_score(dialect_name: str, terms: List[str]) -> Any:
+    """
+    Return relevance score expression of search results, higher is better.
+    """
+    if dialect_name == "postgresql":
+        # `real` rank is cast to keep exact values in pagination cursors.
+        return cast(func.ts_rank_cd(TITLE_DOCUMENT, get_tsquery(terms)), Float)
+    return -func.bm25(literal_column("task_fts"))
+
+
+def apply_search(statement: Any, dialect_name: str, terms: List[str]) -> Any:
+    """
+    Filter `statement` over `task` table by search terms.
+    """
+    if dialect_name == "postgresql":
+        return statement.where(TITLE_DOCUMENT.op("@@")(get_tsquery(terms)))
+    return statement.join(
+        task_fts, task_fts.c.rowid == literal_column("task.id")
+    ).where(literal_column("task_fts").op("MATCH")(to_fts5_query(terms)))
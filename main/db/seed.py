@@ -0,0 +1,121 @@
+"""
+Module seeding users with random tasks for benchmarks and tests.
+"""
+import random
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple
+
+from sqlalchemy import delete, insert, select, text
+
+from main.core.security import get_password_hash
+from main.db.session import get_engine
+from main.models.task import Task
+from main.models.user import User
+
+WORDS = (
+    "buy milk bread call mom pay rent book flight clean kitchen fix bike walk dog "
+    "write report review code plan trip water plants read email send invoice "
+    "renew passport order pizza backup laptop update resume meet team"
+).split()
+SEED_CHUNK_SIZE = 10_000
+SEED_PASSWORD = "seedpassword"
+
+
+class SeededUser(NamedTuple):
+    id: int
+    username: str
+    task_ids: List[int]
+
+
+def make_title(rnd: random.Random) -> str:
+    return " ".join(rnd.sample(WORDS, k=rnd.randint(2, 5)))
+
+
+def make_prefix() -> str:
+    return f"seed-{uuid.uuid4().hex[:8]}"
+
+
+def seed_tasks(owner_id: int, tasks: int, rnd: random.Random) -> None:
+    """
+    Insert `tasks` tasks with random titles in chunks.
+    """
+    engine = get_engine()
+    for offset in range(0, tasks, SEED_CHUNK_SIZE):
+        values = [
+            {
+                "title": make_title(rnd),
+                "done": bool(rnd.getrandbits(1)),
+                "owner_id": owner_id,
+            }
+            for _ in range(min(SEED_CHUNK_SIZE, tasks - offset))
+        ]
+        with engine.begin() as connection:
+            connection.execute(insert(Task.__table__), values)
+
+
+def seed_users(
+    users: int, tasks: int, seed: int = 0, prefix: str = ""
+) -> List[SeededUser]:
+    """
+    Create `users` users owning `tasks` tasks each.
+
+    Usernames start with `prefix`, all users share `SEED_PASSWORD`, hashed once
+    to keep seeding fast.
+    """
+    engine = get_engine()
+    tasks_table = Task.__table__
+    rnd = random.Random(seed)
+    prefix = prefix or make_prefix()
+    hashed_password = get_password_hash(SEED_PASSWORD)
+    seeded = []
+    for number in range(users):
+        username = f"{prefix}-{number}"
+        with engine.begin() as connection:
+            owner_id = connection.execute(
+                insert(User.__table__).values(
+                    username=username,
+                    email=f"{username}@example.com",
+                    full_name="Seed",
+                    hashed_password=hashed_password,
+                )
+            ).inserted_primary_key[0]
+        seed_tasks(owner_id=owner_id, tasks=tasks, rnd=rnd)
+        with engine.connect() as connection:
+            task_ids = list(
+                connection.execute(
+                    select(tasks_table.c.id)
+                    .where(tasks_table.c.owner_id == owner_id)
+                    .order_by(tasks_table.c.id)
+                ).scalars()
+            )
+        seeded.append(SeededUser(id=owner_id, username=username, task_ids=task_ids))
+    if engine.dialect.name == "postgresql":
+        # Vacuum sets visibility map, so planner can pick index-only scans.
+        autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+        with autocommit_engine.connect() as connection:
+            connection.execute(text("VACUUM ANALYZE"))
+    return seeded
+
+
+def delete_users(prefix: str) -> None:
+    """
+    Delete users with usernames starting with `prefix` along with their tasks.
+    """
+    tasks, users = Task.__table__, User.__table__
+    user_ids = select(users.c.id).where(users.c.username.startswith(prefix))
+    with get_engine().begin() as connection:
+        connection.execute(delete(tasks).where(tasks.c.owner_id.in_(user_ids)))
+        connection.execute(delete(users).where(users.c.username.startswith(prefix)))
+
+
+@contextmanager
+def seeded_users(users: int, tasks: int, seed: int = 0) -> Iterator[List[SeededUser]]:
+    """
+    Seed users with tasks, deleting them and users named after them on exit.
+    """
+    prefix = make_prefix()
+    try:
+        yield seed_users(users=users, tasks=tasks, seed=seed, prefix=prefix)
+    finally:
+        delete_users(prefix=prefix)
@@ -1,22 +1,130 @@
-from typing import Generator
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from main.core.config import get_app_settings
+from main.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 
-settings = get_app_settings()
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
 
-engine = create_engine(url=settings.database_url, echo=True, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Return database url with asyncio compatible driver.
+    """
+    drivername = ASYNC_DRIVERS.get(make_url(database_url).get_backend_name())
+    if not drivername:
+        return database_url
+    _, _, location = database_url.partition("://")
+    return f"{drivername}://{location}"
+
+
+def get_engine_kwargs(database_url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Return engine options with connection pool configured from settings.
+    """
+    settings = get_app_settings()
+    kwargs: Dict[str, Any] = {}
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            # In-memory SQLite database lives in a single connection.
+            return kwargs
+        if not is_async:
+            # Pooled connections are shared between threadpool workers.
+            kwargs["connect_args"] = {"check_same_thread": False}
+    kwargs.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        **settings.database_pool_kwargs,
+    )
+    return kwargs
+
+
+@lru_cache
+def get_engine() -> Engine:
+    """
+    Return database engine, created on first use to keep imports fast.
+    """
+    settings = get_app_settings()
+    return create_engine(
+        url=settings.database_url,
+        future=True,
+        **get_engine_kwargs(database_url=settings.database_url),
+    )
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """
+    Return asyncio database engine, created on first use.
+    """
+    settings = get_app_settings()
+    return create_async_engine(
+        get_async_database_url(database_url=settings.database_url),
+        **get_engine_kwargs(database_url=settings.database_url, is_async=True),
+    )
+
+
+# Sessions are bound to engines on creation, see `get_db` and `get_async_db`.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+AsyncSessionLocal = sessionmaker(
+    autoflush=False, class_=AsyncSession, expire_on_commit=False
+)
+
+
+def get_created_engines() -> Dict[str, Engine]:
+    """
+    Return engines created by this process, asyncio one by its sync engine.
+    """
+    engines = {}
+    if get_engine.cache_info().currsize:
+        engines["sync"] = get_engine()
+    if get_async_engine.cache_info().currsize:
+        engines["async"] = get_async_engine().sync_engine
+    return engines
+
+
+async def dispose_engines() -> None:
+    """
+    Close all pooled database connections of created engines.
+    """
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+
+
+def reset_engines_after_fork() -> None:
+    """
+    Replace connection pools inherited from parent process.
+
+    Connections of the parent are left open, as the parent still uses them.
+    """
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=False)  # type: ignore
+    if get_async_engine.cache_info().currsize:
+        get_async_engine().sync_engine.dispose(close=False)
 
 
 def get_db() -> Generator:
     """
     Generator dependency yield database connection.
     """
-    db = SessionLocal()
+    db = SessionLocal(bind=get_engine())
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator:
+    """
+    Async generator dependency yield asyncio database connection.
+    """
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
@@ -1,18 +1,26 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from main.db.base_class import Base
+from main.db.search import add_search_ddl_listeners
 
 if TYPE_CHECKING:
     from .user import User  # noqa
 
 
 class Task(Base):
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    __table_args__ = (
+        Index("ix_task_owner_id_id", "owner_id", "id"),
+        Index("ix_task_owner_id_done", "owner_id", "done"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String)
     done = Column(Boolean, default=False)
+    # Incremented on every update, used for optimistic concurrency control.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     owner_id = Column(Integer, ForeignKey("user.id"))
     owner = relationship("User", back_populates="tasks")
@@ -20,3 +28,6 @@ class Task(Base):
     def __init__(self, title: str, owner_id: int) -> None:
         self.title = title
         self.owner_id = owner_id
+
+
+add_search_ddl_listeners(task_table=Task.__table__)
@@ -1,9 +1,8 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Float, Integer, String
 from sqlalchemy.orm import relationship
 
-from main.core.security import get_password_hash
 from main.db.base_class import Base
 
 if TYPE_CHECKING:
@@ -11,19 +10,23 @@ if TYPE_CHECKING:
 
 
 class User(Base):
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     username = Column(String, unique=True)
     email = Column(String)
     full_name = Column(String)
     hashed_password = Column(String, nullable=False)
     disabled = Column(Boolean, default=False)
+    # Bumped on every change of user tasks, used as task list ETag.
+    tasks_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Unix time, refresh tokens issued before it are rejected by every worker.
+    tokens_valid_after = Column(Float, nullable=True)
 
     tasks = relationship("Task", back_populates="owner")
 
     def __init__(
-        self, username: str, email: str, full_name: str, password: str
+        self, username: str, email: str, full_name: str, hashed_password: str
     ) -> None:
         self.username = username
         self.email = email
         self.full_name = full_name
-        self.hashed_password = get_password_hash(password=password)
+        self.hashed_password = hashed_password
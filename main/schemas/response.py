@@ -10,6 +10,9 @@ class Response(GenericModel, Generic[ResponseData]):
     data: Optional[ResponseData] = None
     message: Optional[str] = None
     errors: Optional[list] = None
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_exact: Optional[bool] = None
 
     def dict(self, *args, **kwargs) -> Dict[str, Any]:  # type: ignore
         """Exclude `null` values from the response."""
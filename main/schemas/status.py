@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
@@ -5,3 +7,29 @@ class Status(BaseModel):
     success: bool = True
     version: str
     message: str
+
+
+class PoolStatus(BaseModel):
+    pool: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    checkouts: Optional[int] = None
+    timeouts: Optional[int] = None
+    wait_time_total: Optional[float] = None
+    wait_time_avg: Optional[float] = None
+    wait_time_max: Optional[float] = None
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+class CacheStatus(BaseModel):
+    tasks: Optional[CacheStats] = None
+    credentials: CacheStats
@@ -1,6 +1,6 @@
-from typing import List
+from typing import List, Optional
 
-from pydantic import BaseModel, Field, root_validator
+from pydantic import BaseModel, Field
 
 
 class TaskBase(BaseModel):
@@ -12,14 +12,14 @@ class Task(TaskBase):
     id: int
 
 
-class TaskInDB(Task):
+class TaskInDB(BaseModel):
+    id: int
+    title: str = Field(..., title="Task title")
+    done: bool = Field(..., title="Task finish state")
+    version: int = Field(..., title="Task version")
+
     class Config:
         orm_mode = True
-        fields_order = ["id", "title", "done"]
-
-    @root_validator
-    def reorder(cls, values: dict) -> dict:
-        return {field: values[field] for field in cls.Config.fields_order}
 
 
 class TaskInCreate(BaseModel):
@@ -30,5 +30,32 @@ class TaskInUpdate(TaskBase):
     ...
 
 
+class TaskInBulkUpdate(TaskInUpdate):
+    id: int
+
+
+class TaskInBulkResult(BaseModel):
+    id: Optional[int] = None
+    success: bool = True
+    data: Optional[TaskInDB] = None
+    message: Optional[str] = None
+
+
+class TasksFilter(BaseModel):
+    done: Optional[bool] = Field(None, title="Task finish state")
+    title_prefix: Optional[str] = Field(None, title="Task title starts with")
+    title_contains: Optional[str] = Field(
+        None, title="Task title contains, case insensitive"
+    )
+    id_gte: Optional[int] = Field(None, title="Task id is greater or equal")
+    id_lte: Optional[int] = Field(None, title="Task id is less or equal")
+
+
+class TasksStats(BaseModel):
+    total: int
+    done: int
+    undone: int
+
+
 class TasksInDelete(BaseModel):
     ids: List[int]
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Optional
 
 from pydantic import BaseModel, EmailStr
@@ -9,9 +10,15 @@ class User(BaseModel):
     full_name: str
 
 
+class TokenType(str, Enum):
+    basic = "basic"
+    bearer = "bearer"
+
+
 class UserLogin(BaseModel):
     username: str
     password: str
+    token_type: TokenType = TokenType.basic
 
     class Config:
         schema_extra = {"example": {"username": "user", "password": "weakpassword"}}
@@ -32,3 +39,10 @@ class UserInDB(User):
 
 class UserToken(BaseModel):
     token: str
+    token_type: TokenType = TokenType.basic
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+
+
+class UserTokenRefresh(BaseModel):
+    refresh_token: str
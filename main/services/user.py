@@ -1,75 +1,248 @@
-from typing import Optional
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional, Union
 
 from fastapi import Depends
 from fastapi.security import HTTPBasicCredentials
-from starlette.status import HTTP_401_UNAUTHORIZED
+from starlette.concurrency import run_in_threadpool
+from starlette.status import HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED
 
+from main.core.config import get_app_settings
 from main.core.exceptions import (
+    InactiveUserAccountException,
     InvalidUserCredentialsException,
     UserAlreadyExistException,
     UserNotFoundException,
 )
-from main.core.logging import logger
-from main.core.security import get_basic_auth_token, verify_password
-from main.db.repositories.users import UsersRepository, get_users_repository
+from main.core.logging import get_logger
+from main.core.security import (
+    ACCESS_TOKEN,
+    REFRESH_TOKEN,
+    Identity,
+    TokenPayload,
+    TokenState,
+    create_token,
+    decode_token,
+    get_basic_auth_token,
+    get_credentials_cache,
+    get_password_hash_async,
+    get_token_state_cache,
+    verify_password,
+    verify_password_async,
+)
+from main.db.repositories.users import (
+    AsyncUsersRepository,
+    UsersRepository,
+    get_async_users_repository,
+    get_users_repository,
+)
 from main.models.user import User
-from main.schemas.user import UserInCreate, UserLogin, UserToken
+from main.schemas.user import TokenType, UserInCreate, UserLogin, UserToken
 
+logger = get_logger("user")
 
-class UserService:
-    def __init__(
-        self, user_repo: UsersRepository = Depends(get_users_repository)
-    ) -> None:
-        self.user_repo = user_repo
 
-    def login_user(self, user: UserLogin) -> UserToken:
+class BaseUserService(ABC):
+    """
+    Login, registration and token flows shared by sync and asyncio services.
+
+    Repository methods are called through `call_repo`, so subclasses decide
+    whether they run in threadpool or on the event loop.
+    """
+
+    user_repo: Union[UsersRepository, AsyncUsersRepository]
+
+    @abstractmethod
+    async def call_repo(self, method: Callable[..., Any], **kwargs: Any) -> Any:
+        """
+        Call repository method without blocking the event loop.
+        """
+
+    async def login_user(self, user: UserLogin) -> UserToken:
         """
         Authenticate user with provided credentials.
         """
-        logger.info(f"Try to login user: {user.username}")
-        self.authenticate(username=user.username, password=user.password)
+        logger.info("Try to login user: %s", user.username)
+        db_user = await self.authenticate_async(
+            username=user.username, password=user.password
+        )
+        if user.token_type == TokenType.bearer:
+            return self.create_tokens(user=db_user)
         return UserToken(
             token=get_basic_auth_token(username=user.username, password=user.password)
         )
 
-    def register_user(self, user_create: UserInCreate) -> User:
+    async def refresh_tokens(self, refresh_token: str) -> UserToken:
+        """
+        Issue new signed tokens by valid refresh token.
+        """
+        payload = self.verify_token(token=refresh_token, token_type=REFRESH_TOKEN)
+        user = await self.call_repo(self.user_repo.get, obj_id=payload.user_id)
+        return self.create_tokens(
+            user=self.check_can_refresh(user=user, payload=payload)
+        )
+
+    async def register_user(self, user_create: UserInCreate) -> User:
         """
         Register user in application.
         """
-        logger.info(f"Try to find user: {user_create.username}")
-        db_user = self.user_repo.get_by_username(username=user_create.username)
+        logger.info("Try to find user: %s", user_create.username)
+        db_user = await self.call_repo(
+            self.user_repo.get_by_username, username=user_create.username
+        )
         if db_user:
             raise UserAlreadyExistException(
                 message=f"User with username: `{user_create.username}` already exists",
                 status_code=HTTP_401_UNAUTHORIZED,
             )
-        logger.info(f"Creating user: {user_create.username}")
-        user = self.user_repo.create(obj_create=user_create)
+        logger.info("Creating user: %s", user_create.username)
+        hashed_password = await get_password_hash_async(password=user_create.password)
+        user = await self.call_repo(
+            self.user_repo.create_with_password,
+            obj_create=user_create,
+            hashed_password=hashed_password,
+        )
         return user
 
-    def get_user(self, credentials: HTTPBasicCredentials) -> Optional[User]:
+    async def disable_user(self, user_id: int) -> User:
         """
-        Retrieve current user info by login credentials.
+        Disable user and revoke all tokens issued to the user so far.
         """
-        logger.info(f"Getting user: {credentials.username}")
-        return self.user_repo.get_by_username(username=credentials.username)
+        logger.info("Disabling user: %s", user_id)
+        user = await self.call_repo(
+            self.user_repo.disable, obj_id=user_id, revoked_at=time.time()
+        )
+        if user is None:
+            raise UserNotFoundException(
+                message="User not found", status_code=HTTP_401_UNAUTHORIZED
+            )
+        get_token_state_cache().delete(user.id)
+        return user
 
-    def authenticate(self, username: str, password: str) -> User:
+    async def authenticate_async(self, username: str, password: str) -> User:
         """
-        Authenticate user.
+        Authenticate user, verifying password in password hashing executor.
+        """
+        logger.info("Try to authenticate user: %s", username)
+        user = self.check_user_exists(
+            user=await self.call_repo(
+                self.user_repo.get_by_username, username=username
+            ),
+            username=username,
+        )
+        if not await self.verify_credentials_async(user=user, password=password):
+            raise InvalidUserCredentialsException(
+                message="Invalid credentials", status_code=HTTP_401_UNAUTHORIZED
+            )
+        return user
+
+    @staticmethod
+    def check_user_exists(user: Optional[User], username: str) -> User:
+        """
+        Return user found by `username` or raise if user not found.
         """
-        logger.info(f"Try to authenticate user: {username}")
-        user = self.user_repo.get_by_username(username=username)
         if not user:
             raise UserNotFoundException(
                 message=f"User with username: `{username}` not found",
                 status_code=HTTP_401_UNAUTHORIZED,
             )
-        if not verify_password(
+        return user
+
+    @classmethod
+    async def verify_credentials_async(cls, user: User, password: str) -> bool:
+        """
+        Check user password in password hashing executor.
+        """
+        if cls.is_recently_verified(user=user, password=password):
+            return True
+        if not await verify_password_async(
             plain_password=password, hashed_password=user.hashed_password
         ):
+            return False
+        cls.remember_credentials(user=user, password=password)
+        return True
+
+    @staticmethod
+    def is_recently_verified(user: User, password: str) -> bool:
+        """
+        Check if credentials are present in verified credentials cache.
+        """
+        cached = get_credentials_cache().get(
+            user_id=user.id, password=password, hashed_password=user.hashed_password
+        )
+        return cached is not None
+
+    @staticmethod
+    def remember_credentials(user: User, password: str) -> None:
+        """
+        Put successfully verified credentials to cache.
+        """
+        get_credentials_cache().add(
+            user_id=user.id, password=password, hashed_password=user.hashed_password
+        )
+
+    @staticmethod
+    def verify_token(token: str, token_type: str) -> TokenPayload:
+        """
+        Return payload of token with valid signature and not expired.
+        """
+        payload = decode_token(token=token, token_type=token_type)
+        if payload is None:
             raise InvalidUserCredentialsException(
-                message="Invalid credentials", status_code=HTTP_401_UNAUTHORIZED
+                message="Invalid token", status_code=HTTP_401_UNAUTHORIZED
+            )
+        return payload
+
+    @staticmethod
+    def create_tokens(user: User) -> UserToken:
+        """
+        Issue signed access and refresh tokens for the user.
+        """
+        settings = get_app_settings()
+        is_active = not user.disabled
+        return UserToken(
+            token=create_token(
+                user_id=user.id,
+                is_active=is_active,
+                token_type=ACCESS_TOKEN,
+                ttl=settings.access_token_ttl,
+            ),
+            token_type=TokenType.bearer,
+            refresh_token=create_token(
+                user_id=user.id,
+                is_active=is_active,
+                token_type=REFRESH_TOKEN,
+                ttl=settings.refresh_token_ttl,
+            ),
+            expires_in=settings.access_token_ttl,
+        )
+
+    @staticmethod
+    def get_token_state(user: User) -> TokenState:
+        """
+        Return state of the user checked by signed tokens.
+        """
+        return TokenState(
+            is_active=not user.disabled,
+            tokens_valid_after=user.tokens_valid_after,  # type: ignore
+        )
+
+    @classmethod
+    def check_can_refresh(cls, user: Optional[User], payload: TokenPayload) -> User:
+        """
+        Check if tokens can be refreshed for the user loaded by refresh token.
+
+        Refresh tokens issued before `tokens_valid_after` of the user are revoked.
+        """
+        if not user or cls.get_token_state(user=user).is_revoked(
+            issued_at=payload.issued_at
+        ):
+            raise InvalidUserCredentialsException(
+                message="Invalid token", status_code=HTTP_401_UNAUTHORIZED
+            )
+        if user.disabled:
+            raise InactiveUserAccountException(
+                message="Inactive user", status_code=HTTP_400_BAD_REQUEST
             )
         return user
 
@@ -78,3 +251,90 @@ class UserService:
         Check if user account is active.
         """
         return self.user_repo.is_active(user=user)
+
+
+class UserService(BaseUserService):
+    user_repo: UsersRepository
+
+    def __init__(
+        self, user_repo: UsersRepository = Depends(get_users_repository)
+    ) -> None:
+        self.user_repo = user_repo
+
+    async def call_repo(self, method: Callable[..., Any], **kwargs: Any) -> Any:
+        return await run_in_threadpool(method, **kwargs)
+
+    def get_user(self, credentials: HTTPBasicCredentials) -> Optional[User]:
+        """
+        Retrieve current user info by login credentials.
+        """
+        logger.info("Getting user: %s", credentials.username)
+        return self.user_repo.get_by_username(username=credentials.username)
+
+    def get_user_by_id(self, user_id: int) -> Optional[User]:
+        """
+        Retrieve user by `id` field.
+        """
+        return self.user_repo.get(obj_id=user_id)
+
+    def authenticate_token(self, token: str) -> Identity:
+        """
+        Return identity from signed access token.
+
+        Token is checked against user state cached for `token_state_cache_ttl`
+        seconds, so most requests skip the database, and revoked tokens or
+        disabled users are rejected after that time at most.
+        """
+        payload = self.verify_token(token=token, token_type=ACCESS_TOKEN)
+        cache = get_token_state_cache()
+        state = cache.get(payload.user_id)
+        if state is None:
+            user = self.get_user_by_id(user_id=payload.user_id)
+            if user is not None:
+                state = self.get_token_state(user=user)
+                cache.set(payload.user_id, state)
+        if state is None or state.is_revoked(issued_at=payload.issued_at):
+            raise InvalidUserCredentialsException(
+                message="Invalid token", status_code=HTTP_401_UNAUTHORIZED
+            )
+        return Identity(id=payload.user_id, is_active=state.is_active)
+
+    def authenticate(self, username: str, password: str) -> User:
+        """
+        Authenticate user.
+        """
+        logger.info("Try to authenticate user: %s", username)
+        user = self.check_user_exists(
+            user=self.user_repo.get_by_username(username=username), username=username
+        )
+        if not self.verify_credentials(user=user, password=password):
+            raise InvalidUserCredentialsException(
+                message="Invalid credentials", status_code=HTTP_401_UNAUTHORIZED
+            )
+        return user
+
+    @classmethod
+    def verify_credentials(cls, user: User, password: str) -> bool:
+        """
+        Check user password, skipping bcrypt for recently verified credentials.
+        """
+        if cls.is_recently_verified(user=user, password=password):
+            return True
+        if not verify_password(
+            plain_password=password, hashed_password=user.hashed_password
+        ):
+            return False
+        cls.remember_credentials(user=user, password=password)
+        return True
+
+
+class AsyncUserService(BaseUserService):
+    user_repo: AsyncUsersRepository
+
+    def __init__(
+        self, user_repo: AsyncUsersRepository = Depends(get_async_users_repository)
+    ) -> None:
+        self.user_repo = user_repo
+
+    async def call_repo(self, method: Callable[..., Any], **kwargs: Any) -> Any:
+        return await method(**kwargs)
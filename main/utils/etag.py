@@ -0,0 +1,68 @@
+import hashlib
+from typing import Any, List, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Return weak entity tag built from `parts`.
+    """
+    digest = hashlib.sha1(  # noqa: S324 not used for security
+        ":".join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def make_version_etag(version: int, *parts: Any) -> str:
+    """
+    Return strong entity tag carrying resource `version` for `If-Match` requests.
+
+    `parts` must cover every field of the representation, so the tag changes
+    whenever its bytes do.
+    """
+    digest = make_etag(*parts)[3:-1]
+    return f'"{version}.{digest[:12]}"'
+
+
+def get_if_match_tags(request: Request) -> Optional[List[str]]:
+    """
+    Return strong entity tags from `If-Match` header.
+
+    `None` means the header is missing or matches any tag. Comparison is
+    strong, as required for `If-Match`, so weak tags are dropped.
+    """
+    if_match = request.headers.get("if-match")
+    if not if_match or if_match.strip() == "*":
+        return None
+    return [
+        tag
+        for tag in (tag.strip() for tag in if_match.split(","))
+        if len(tag) > 1 and tag.startswith('"') and tag.endswith('"')
+    ]
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Check if `If-None-Match` request header matches the entity tag.
+
+    Comparison is weak, as required for `If-None-Match`.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    opaque_tag = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == opaque_tag:
+            return True
+    return False
+
+
+def not_modified_response(etag: str) -> Response:
+    """
+    Return empty `304 Not Modified` response.
+    """
+    return Response(status_code=HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
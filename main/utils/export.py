@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+from enum import Enum
+from itertools import islice
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Sequence
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+    @property
+    def media_type(self) -> str:
+        return {
+            ExportFormat.ndjson: "application/x-ndjson",
+            ExportFormat.csv: "text/csv",
+        }[self]
+
+
+def iter_chunks(rows: Iterable[Any], size: int) -> Iterator[Sequence[Any]]:
+    """
+    Split rows into lists of at most `size` items.
+    """
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def aiter_chunks(
+    rows: AsyncIterable[Any], size: int
+) -> AsyncIterator[Sequence[Any]]:
+    """
+    Split rows of async iterable into lists of at most `size` items.
+    """
+    chunk = []
+    async for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def dump_ndjson(chunk: Sequence[Sequence[Any]], fields: Sequence[str]) -> str:
+    return "".join(
+        json.dumps(dict(zip(fields, row)), separators=(",", ":")) + "\n"
+        for row in chunk
+    )
+
+
+def dump_csv(chunk: Sequence[Sequence[Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(chunk)
+    return buffer.getvalue()
+
+
+def dump_chunk(
+    chunk: Sequence[Sequence[Any]], fields: Sequence[str], export_format: ExportFormat
+) -> str:
+    """
+    Serialize chunk of rows to requested export format.
+    """
+    if export_format == ExportFormat.csv:
+        return dump_csv(chunk)
+    return dump_ndjson(chunk, fields=fields)
+
+
+def dump_header(fields: Sequence[str], export_format: ExportFormat) -> str:
+    """
+    Return header line of requested export format, CSV has one.
+    """
+    if export_format == ExportFormat.csv:
+        return dump_csv([fields])
+    return ""
+
+
+def iter_export(
+    rows: Iterable[Sequence[Any]],
+    fields: Sequence[str],
+    export_format: ExportFormat,
+    chunk_size: int,
+) -> Iterator[str]:
+    """
+    Serialize rows to requested export format, one chunk of rows at a time.
+
+    Header is sent along with the first chunk, or alone for an empty export.
+    """
+    header = dump_header(fields, export_format=export_format)
+    for chunk in iter_chunks(rows, size=chunk_size):
+        yield header + dump_chunk(chunk, fields=fields, export_format=export_format)
+        header = ""
+    if header:
+        yield header
+
+
+async def aiter_export(
+    rows: AsyncIterable[Sequence[Any]],
+    fields: Sequence[str],
+    export_format: ExportFormat,
+    chunk_size: int,
+) -> AsyncIterator[str]:
+    """
+    Serialize rows of async iterable to requested export format.
+    """
+    header = dump_header(fields, export_format=export_format)
+    async for chunk in aiter_chunks(rows, size=chunk_size):
+        yield header + dump_chunk(chunk, fields=fields, export_format=export_format)
+        header = ""
+    if header:
+        yield header
@@ -0,0 +1,56 @@
+import base64
+import binascii
+import json
+import math
+from typing import Any, Dict, Tuple, Type, Union
+
+from starlette.status import HTTP_400_BAD_REQUEST
+
+from main.core.exceptions import InvalidCursorException
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """
+    Return opaque pagination cursor for provided key values.
+    """
+    data = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+# Bounds of 64-bit integer columns, larger values fail in database drivers.
+MIN_INT = -(2**63)
+MAX_INT = 2**63 - 1
+
+FieldType = Union[Type, Tuple[Type, ...]]
+
+
+def is_valid_value(value: Any, field_type: FieldType) -> bool:
+    """
+    Check if cursor value is of `field_type`, booleans are not integers here.
+
+    Floats must be finite, as JSON decoder accepts `NaN` and `Infinity`.
+    """
+    if isinstance(value, bool) or not isinstance(value, field_type):
+        return False
+    if isinstance(value, float):
+        return math.isfinite(value)
+    return not isinstance(value, int) or MIN_INT <= value <= MAX_INT
+
+
+def decode_cursor(cursor: str, fields: Dict[str, FieldType]) -> Dict[str, Any]:
+    """
+    Return key values from pagination cursor, checking `fields` types.
+    """
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, ValueError):
+        values = None
+    if not isinstance(values, dict) or not all(
+        field in values and is_valid_value(values[field], field_type)
+        for field, field_type in fields.items()
+    ):
+        raise InvalidCursorException(
+            message="Invalid pagination cursor", status_code=HTTP_400_BAD_REQUEST
+        )
+    return values
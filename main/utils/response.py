@@ -0,0 +1,21 @@
+from typing import Any, Iterable, Sequence
+
+from fastapi.responses import ORJSONResponse
+from starlette.status import HTTP_200_OK
+
+
+def rows_response(
+    rows: Iterable[Sequence[Any]],
+    fields: Sequence[str],
+    status_code: int = HTTP_200_OK,
+    **extra: Any,
+) -> ORJSONResponse:
+    """
+    Return `Response` envelope built from column ordered row tuples.
+
+    Rows are dumped straight to JSON bytes, skipping model validation, so
+    `fields` must match the columns of `response_model`.
+    """
+    content = {"success": True, "data": [dict(zip(fields, row)) for row in rows]}
+    content.update((key, value) for key, value in extra.items() if value is not None)
+    return ORJSONResponse(content=content, status_code=status_code)
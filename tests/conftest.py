@@ -0,0 +1,57 @@
+import os
+import tempfile
+from typing import Generator
+
+# Settings are read on first use, so test ones go to environment before imports.
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ["DATABASE_URL"] = os.environ.get(
+    "TEST_DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+os.environ["ASYNC_DATABASE"] = "false"
+os.environ["CACHE_SIZE"] = "0"
+os.environ["METRICS_ENABLED"] = "true"
+os.environ["RATE_LIMITS"] = "{}"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from main.app import app  # noqa: E402
+from main.core.security import (  # noqa: E402
+    get_credentials_cache,
+    get_token_state_cache,
+)
+from main.db.base import Base  # noqa: E402
+from main.db.session import SessionLocal, get_engine  # noqa: E402
+
+
+@pytest.fixture
+def engine() -> Generator[Engine, None, None]:
+    """
+    Engine of test database with empty tables.
+
+    Caches by user id are cleared too, as ids are reused by new tables.
+    """
+    get_credentials_cache().clear()
+    get_token_state_cache().clear()
+    engine = get_engine()
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def db(engine: Engine) -> Generator[Session, None, None]:
+    session = SessionLocal(bind=engine)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(engine: Engine) -> Generator[TestClient, None, None]:
+    with TestClient(app) as client:
+        yield client
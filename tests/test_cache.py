@@ -0,0 +1,33 @@
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from main.core.cache import LRUCacheBackend
+from main.db.repositories.tasks import TasksRepository
+from main.db.seed import seed_users
+from main.models.task import Task
+
+
+def test_read_does_not_cache_row_invalidated_meanwhile(
+    engine: Engine, db: Session
+) -> None:
+    (owner,) = seed_users(users=1, tasks=1)
+    task_id = owner.task_ids[0]
+    cache = LRUCacheBackend(maxsize=10, ttl=60)
+    tasks_repo = TasksRepository(db=db, model=Task, cache=cache)
+
+    def after_cursor_execute(*args: Any) -> None:
+        # Write committed by another request while the row is being read.
+        tasks_repo.invalidate(obj_ids=[task_id])
+
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        assert tasks_repo.get(obj_id=task_id) is not None
+    finally:
+        event.remove(engine, "after_cursor_execute", after_cursor_execute)
+
+    assert tasks_repo.get_cached(obj_id=task_id) is None
+    tasks_repo.get(obj_id=task_id)
+    assert tasks_repo.get_cached(obj_id=task_id) is not None
@@ -0,0 +1,128 @@
+from typing import Any, Callable, List, Tuple
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from main.db.repositories.tasks import TasksRepository
+from main.db.seed import SeededUser, seed_users
+from main.models.task import Task
+from main.schemas.tasks import TasksFilter
+
+Statement = Tuple[str, Any]
+
+
+def capture_statements(engine: Engine, action: Callable[[], Any]) -> List[Statement]:
+    """
+    Return SQL statements with parameters executed by `action`.
+    """
+    statements: List[Statement] = []
+
+    def before_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any, *args: Any
+    ) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def explain(engine: Engine, statement: str, parameters: Any) -> str:
+    """
+    Return query plan of statement, index scans are preferred on PostgreSQL.
+    """
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            # Tiny test tables are cheaper to scan, only usable indexes matter.
+            connection.exec_driver_sql("SET enable_seqscan = off")
+            rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        else:
+            rows = connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+        return "\n".join(str(row[-1]) for row in rows)
+
+
+def is_full_scan(plan: str) -> bool:
+    return "SCAN task" in plan or "Seq Scan on task" in plan
+
+
+@pytest.fixture
+def owner(engine: Engine) -> SeededUser:
+    return seed_users(users=20, tasks=100)[0]
+
+
+@pytest.fixture
+def tasks_repo(db: Session) -> TasksRepository:
+    return TasksRepository(db=db, model=Task)
+
+
+@pytest.mark.parametrize(
+    "query, index",
+    [
+        (
+            lambda repo, owner: repo.get_rows_by_owner(
+                owner_id=owner.id, fields=["id", "title", "done"], limit=10
+            ),
+            "ix_task_owner_id_id",
+        ),
+        (
+            lambda repo, owner: repo.get_rows_by_owner(
+                owner_id=owner.id,
+                fields=["id", "title", "done"],
+                after_id=owner.task_ids[10],
+                limit=10,
+            ),
+            "ix_task_owner_id_id",
+        ),
+        (
+            lambda repo, owner: repo.get_rows_by_owner(
+                owner_id=owner.id,
+                fields=["id", "title", "done"],
+                filters=TasksFilter(done=True),
+            ),
+            "ix_task_owner_id_done",
+        ),
+        (
+            lambda repo, owner: repo.get_stats_by_owner(owner_id=owner.id),
+            "ix_task_owner_id_done",
+        ),
+        (
+            lambda repo, owner: repo.delete_many_by_owner(
+                obj_ids=owner.task_ids[:3], owner_id=owner.id
+            ),
+            "ix_task_owner_id_id",
+        ),
+    ],
+    ids=["list", "list-after-id", "list-done", "stats", "delete-many"],
+)
+def test_owner_scoped_query_uses_index(
+    engine: Engine,
+    tasks_repo: TasksRepository,
+    owner: SeededUser,
+    query: Callable[[TasksRepository, SeededUser], Any],
+    index: str,
+) -> None:
+    statements = capture_statements(engine, lambda: query(tasks_repo, owner))
+
+    plan = explain(engine, *statements[0])
+
+    assert index in plan, plan
+    assert not is_full_scan(plan), plan
+
+
+def test_task_ownership_check_does_not_scan_table(
+    engine: Engine, tasks_repo: TasksRepository, owner: SeededUser
+) -> None:
+    statements = capture_statements(
+        engine, lambda: tasks_repo.get(obj_id=owner.task_ids[0])
+    )
+
+    assert len(statements) == 1
+    plan = explain(engine, *statements[0])
+    assert not is_full_scan(plan), plan
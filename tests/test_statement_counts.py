@@ -0,0 +1,76 @@
+import re
+from typing import Any, Optional, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+from requests import Response
+
+from main.db.session import get_engine
+
+TEST_USER = {
+    "username": "test-user",
+    "email": "test@example.com",
+    "full_name": "Test Test",
+    "password": "weakpassword",
+}
+AUTH = (TEST_USER["username"], TEST_USER["password"])
+STATEMENTS_PATTERN = re.compile(r'db;dur=[\d.]+;desc="(\d+) statements"')
+
+
+def count_statements(response: Response) -> int:
+    """
+    Return number of SQL statements from `Server-Timing` header of metrics.
+    """
+    match = STATEMENTS_PATTERN.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else 0
+
+
+@pytest.fixture
+def user_client(client: TestClient) -> TestClient:
+    """
+    Client of registered user owning tasks with id `1` and `2`.
+    """
+    client.post("/api/v1/user", json=TEST_USER).raise_for_status()
+    for title in ("first", "second"):
+        client.post("/api/v1/tasks", json={"title": title}, auth=AUTH)
+    return client
+
+
+# Authenticated requests load the user once, databases without `RETURNING`
+# read written rows back, so counts are given for SQLite and PostgreSQL.
+@pytest.mark.parametrize(
+    "method, url, body, statements",
+    [
+        ("GET", "/api/v1/user", None, (1, 1)),
+        ("POST", "/api/v1/user/login", TEST_USER, (1, 1)),
+        ("GET", "/api/v1/tasks", None, (3, 3)),
+        ("GET", "/api/v1/tasks?with_total=true", None, (4, 4)),
+        ("GET", "/api/v1/tasks/1", None, (2, 2)),
+        ("GET", "/api/v1/tasks/stats", None, (3, 3)),
+        ("GET", "/api/v1/tasks/search?q=first", None, (2, 2)),
+        ("POST", "/api/v1/tasks", {"title": "third"}, (3, 3)),
+        ("PUT", "/api/v1/tasks/1", {"title": "done", "done": True}, (5, 4)),
+        ("DELETE", "/api/v1/tasks/1", None, (4, 4)),
+        ("POST", "/api/v1/tasks/bulk", [{"title": "a"}, {"title": "b"}], (4, 3)),
+        (
+            "PATCH",
+            "/api/v1/tasks/bulk",
+            [{"id": 1, "title": "a", "done": True}],
+            (5, 5),
+        ),
+        ("DELETE", "/api/v1/tasks", {"ids": [1, 2]}, (3, 3)),
+    ],
+)
+def test_statements_per_endpoint(
+    user_client: TestClient,
+    method: str,
+    url: str,
+    body: Optional[Any],
+    statements: Tuple[int, int],
+) -> None:
+    expected = dict(zip(("sqlite", "postgresql"), statements))
+
+    response = user_client.request(method, url, json=body, auth=AUTH)
+
+    assert response.status_code < 300, response.text
+    assert count_statements(response) == expected[get_engine().dialect.name]
@@ -0,0 +1,62 @@
+from typing import Callable
+
+import pytest
+from fastapi.testclient import TestClient
+
+USER = {
+    "username": "etag-user",
+    "email": "etag@example.com",
+    "full_name": "Etag User",
+    "password": "weakpassword",
+}
+AUTH = (USER["username"], USER["password"])
+
+
+@pytest.fixture
+def etag(client: TestClient) -> str:
+    """
+    Entity tag of task with id `1` of registered user.
+    """
+    client.post("/api/v1/user", json=USER).raise_for_status()
+    client.post("/api/v1/tasks", json={"title": "task"}, auth=AUTH).raise_for_status()
+    response = client.get("/api/v1/tasks/1", auth=AUTH)
+    response.raise_for_status()
+    return response.headers["etag"]
+
+
+def test_update_with_current_etag(client: TestClient, etag: str) -> None:
+    response = client.put(
+        "/api/v1/tasks/1",
+        json={"title": "updated", "done": True},
+        headers={"If-Match": f'"other", {etag}'},
+        auth=AUTH,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    response = client.put(
+        "/api/v1/tasks/1",
+        json={"title": "stale", "done": True},
+        headers={"If-Match": etag},
+        auth=AUTH,
+    )
+    assert response.status_code == 412
+
+
+@pytest.mark.parametrize(
+    "if_match",
+    [lambda etag: etag.split(".")[0] + '.000000000000"', lambda etag: f"W/{etag}"],
+    ids=["same-version-other-digest", "weak"],
+)
+def test_update_with_not_matching_etag(
+    client: TestClient, etag: str, if_match: Callable[[str], str]
+) -> None:
+    response = client.put(
+        "/api/v1/tasks/1",
+        json={"title": "updated", "done": True},
+        headers={"If-Match": if_match(etag)},
+        auth=AUTH,
+    )
+
+    assert response.status_code == 412
+    assert client.get("/api/v1/tasks/1", auth=AUTH).json()["data"]["title"] == "task"
@@ -0,0 +1,51 @@
+from typing import Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+USER = {
+    "username": "token-user",
+    "email": "token@example.com",
+    "full_name": "Token User",
+    "password": "weakpassword",
+}
+
+
+@pytest.fixture
+def tokens(client: TestClient) -> Dict[str, str]:
+    """
+    Signed tokens of registered user.
+    """
+    client.post("/api/v1/user", json=USER).raise_for_status()
+    response = client.post("/api/v1/user/login", json={**USER, "token_type": "bearer"})
+    response.raise_for_status()
+    return response.json()["data"]
+
+
+def test_unauthenticated_request_gets_basic_challenge(client: TestClient) -> None:
+    response = client.get("/api/v1/tasks")
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Basic"
+
+
+def test_disabled_user_tokens_are_revoked(
+    client: TestClient, tokens: Dict[str, str]
+) -> None:
+    bearer = {"Authorization": f"Bearer {tokens['token']}"}
+    assert client.get("/api/v1/tasks", headers=bearer).status_code == 200
+
+    response = client.delete("/api/v1/user", headers=bearer)
+
+    assert response.status_code == 200
+    assert client.get("/api/v1/tasks", headers=bearer).status_code == 401
+    response = client.post(
+        "/api/v1/user/login/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401
+    response = client.post(
+        "/api/v1/tasks",
+        json={"title": "task"},
+        auth=(USER["username"], USER["password"]),
+    )
+    assert response.status_code == 400